@@ -0,0 +1,19 @@
+import time
+
+__all__ = ["pqueue_bench", "reachable_bench", "hpa_bench", "landmarks_bench",
+           "bidirectional_bench", "reachfield_bench", "flowfield_bench",
+           "damagetable_bench", "gamestate_bench"]
+
+def best_time(func, repeat = 5):
+    """
+    Calls func repeat times and returns the fastest run time in seconds.
+    """
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
@@ -0,0 +1,65 @@
+"""
+Compares A* in tiles.find_path_indexed against its bidirectional mode on long
+path queries over generated maps of increasing size, checking that both give
+paths of the same cost.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.bidirectional_bench
+"""
+import time
+import tiles, movement
+from benchmarks.hpa_bench import queries
+from benchmarks.reachable_bench import generated_map
+from unit.jeep import Jeep
+from unit.artillery import Artillery
+
+def search(tile_map, pairs, cost, passable, bidirectional):
+    """
+    Finds a path for each (start, end) pair. Returns a tuple of the total time
+    taken and the path costs.
+    """
+    costs = []
+    start_time = time.perf_counter()
+    for s, e in pairs:
+        path = tiles.find_path_indexed(tile_map, s, e, cost, passable,
+                                       bidirectional = bidirectional)
+        costs.append(sum(cost(i) for i in path[:-1]))
+
+    return (time.perf_counter() - start_time, costs)
+
+def run(name, tile_map, unit, count):
+    """
+    Runs both searches for the unit's profile over count long queries and
+    prints the results.
+    """
+    profile = movement.profile_for(unit)
+    grids = tile_map.profile_grids(profile)
+    cost = grids.cost_list.__getitem__
+    passable = grids.passable_list.__getitem__
+
+    pairs = [(s, e) for s, e in queries(tile_map, grids, count)
+             if tile_map.can_reach(profile, s, e)]
+
+    one_way = search(tile_map, pairs, cost, passable, False)
+    two_way = search(tile_map, pairs, cost, passable, True)
+    assert one_way[1] == two_way[1]
+
+    n = len(pairs)
+    print("{:<22} {:>10.2f} {:>10.2f} {:>8.2f}x".format(
+        name, one_way[0] / n * 1000, two_way[0] / n * 1000,
+        one_way[0] / two_way[0]))
+
+def main():
+    jeep = Jeep(team = 0)
+    artillery = Artillery(team = 0)
+
+    print("{:<22} {:>10} {:>10} {:>9}".format(
+        "map/profile", "A* ms", "bidir. ms", "speedup"))
+    for size, count in ((64, 40), (128, 20), (256, 10), (512, 3)):
+        tile_map = generated_map(size)
+        run("{0}x{0}/jeep".format(size), tile_map, jeep, count)
+        run("{0}x{0}/artillery".format(size), tile_map, artillery, count)
+
+if __name__ == "__main__":
+    main()
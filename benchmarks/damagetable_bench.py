@@ -0,0 +1,54 @@
+"""
+Compares scoring every attacker against every target with rules.get_damage
+against a single damagetable.damages call, for armies of increasing size.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.damagetable_bench
+"""
+import random, time
+import numpy as np
+import rules, gamestate, damagetable
+
+def run(count, seed = 24):
+    """
+    Times both ways of finding the damage of count attackers against count
+    targets on random tiles and prints the results.
+    """
+    rand = random.Random(seed)
+    game = gamestate.GameState([], 0, 0, 2)
+    specs = list(rules.UNIT_SPECS.values())
+    tile_list = list(rules.tile_types.values())
+    attackers = [game.new_unit(rand.choice(specs), 0) for i in range(count)]
+    targets = [game.new_unit(rand.choice(specs), 1) for i in range(count)]
+    target_tiles = [rand.choice(tile_list) for i in range(count)]
+
+    start_time = time.perf_counter()
+    expected = [[rules.get_damage(a, t, tile)
+                 for t, tile in zip(targets, target_tiles)]
+                for a in attackers]
+    method_time = time.perf_counter() - start_time
+
+    attacker_ids = np.array([a.class_id for a in attackers])
+    target_ids = np.array([t.class_id for t in targets])
+    bonuses = np.array([tile.defense_bonus for tile in target_tiles])
+
+    start_time = time.perf_counter()
+    got = damagetable.damages(attacker_ids[:, None], target_ids[None, :],
+                              bonuses[None, :])
+    table_time = time.perf_counter() - start_time
+
+    assert got.tolist() == expected
+
+    print("{:>6} {:>10} {:>10.2f} {:>10.2f} {:>8.1f}x".format(
+        count, count * count, method_time * 1000, table_time * 1000,
+        method_time / table_time))
+
+def main():
+    print("{:>6} {:>10} {:>10} {:>10} {:>9}".format(
+        "units", "pairs", "method ms", "table ms", "speedup"))
+    for count in (10, 50, 200, 500):
+        run(count)
+
+if __name__ == "__main__":
+    main()
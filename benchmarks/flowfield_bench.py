@@ -0,0 +1,64 @@
+"""
+Compares finding the paths of many units to one goal with
+tiles.find_path_indexed against building one TileMap.flow_field and reading
+every path from it, on generated maps of increasing size.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.flowfield_bench
+"""
+import random, time
+import tiles, movement
+from benchmarks.reachable_bench import generated_map
+from unit.artillery import Artillery
+
+def run(size, count, seed = 297):
+    """
+    Times both ways of finding paths from count random tiles to one goal on a
+    size x size map and prints the results.
+    """
+    tile_map = generated_map(size)
+    profile = movement.profile_for(Artillery(team = 0))
+    grids = tile_map.profile_grids(profile)
+    cost = grids.cost_list.__getitem__
+    passable = grids.passable_list.__getitem__
+
+    # a goal in the largest open area, and units which can get to it
+    components = tile_map.components(profile)
+    tiles_open = [i for i, p in enumerate(grids.passable_list) if p]
+    goal = max(tiles_open, key = components.size)
+    rand = random.Random(seed)
+    starts = [i for i in tiles_open if components.connected(i, goal)]
+    starts = rand.sample(starts, count)
+
+    start_time = time.perf_counter()
+    costs = []
+    for s in starts:
+        path = tiles.find_path_indexed(
+            tile_map, s, goal, cost, passable, profile = profile)
+        costs.append(sum(map(cost, path[:-1])))
+    search_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    field = tile_map.flow_field(profile, goal)
+    build_time = time.perf_counter() - start_time
+    flow_costs = []
+    for s in starts:
+        path = field.path_from(s)
+        flow_costs.append(sum(map(cost, path[:-1])))
+    flow_time = time.perf_counter() - start_time
+
+    assert costs == flow_costs
+
+    print("{0:>4}x{0:<4} {1:>6} {2:>10.1f} {3:>10.1f} {4:>10.1f} {5:>8.1f}x"
+          .format(size, count, search_time * 1000, build_time * 1000,
+                  flow_time * 1000, search_time / flow_time))
+
+def main():
+    print("{:<9} {:>6} {:>10} {:>10} {:>10} {:>9}".format(
+        "map", "units", "A* ms", "build ms", "flow ms", "speedup"))
+    for size, count in ((32, 20), (64, 20), (64, 100), (128, 50), (128, 200)):
+        run(size, count)
+
+if __name__ == "__main__":
+    main()
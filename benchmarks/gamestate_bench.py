@@ -0,0 +1,59 @@
+"""
+Plays random games of a level with gamestate.GameState, without pygame, and
+reports how many turns a second it gets through. Every unit moves to a random
+tile it can reach and attacks a random target if it has one.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.gamestate_bench
+"""
+import random, time
+import gamestate
+
+def play(level, turns, rand):
+    """
+    Plays a random game of the given level until a team wins, the turn can't
+    end or the given number of turns have been taken. Returns the number of
+    turns taken.
+    """
+    game = gamestate.GameState.load_level(level)
+
+    while game.turn < turns and game.winner is None:
+        for unit in list(game.team_units(game.cur_team)):
+            if not unit.active or game.winner is not None:
+                continue
+
+            targets = game.move_targets(unit)
+            if targets:
+                game.move(unit, rand.choice(sorted(targets)))
+
+            attacks = game.attack_targets(unit)
+            if attacks:
+                game.attack(unit, rand.choice(sorted(attacks)))
+
+        if game.winner is None and game.end_turn() is not None:
+            break
+
+    return game.turn
+
+def run(level, games, turns = 100, seed = 25):
+    """
+    Plays the given number of random games of a level and prints the results.
+    """
+    rand = random.Random(seed)
+
+    start_time = time.perf_counter()
+    total = sum(play(level, turns, rand) for i in range(games))
+    elapsed = time.perf_counter() - start_time
+
+    print("{:<20} {:>6} {:>8} {:>10.1f} {:>10.0f}".format(
+        level, games, total, elapsed * 1000, total / elapsed))
+
+def main():
+    print("{:<20} {:>6} {:>8} {:>10} {:>10}".format(
+        "level", "games", "turns", "ms", "turns/s"))
+    for level in ("maps/island.lvl", "maps/demo.lvl"):
+        run(level, 20)
+
+if __name__ == "__main__":
+    main()
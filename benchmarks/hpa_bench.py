@@ -0,0 +1,87 @@
+"""
+Compares long path queries answered by an hpa.Hierarchy against flat A* in
+tiles.find_path_indexed, on generated maps of increasing size. Also times
+building the hierarchy and updating it after a tile changes.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.hpa_bench
+"""
+import random, time
+import tiles, movement, helper
+from benchmarks import best_time
+from benchmarks.reachable_bench import generated_map
+from unit.artillery import Artillery
+
+def queries(tile_map, grids, count, seed = 297):
+    """
+    Returns count (start, end) pairs of passable tile indices which are at
+    least half the map's width apart.
+    """
+    rand = random.Random(seed)
+    w, h = tile_map.get_map_size()
+    positions = tile_map.positions
+    passable = grids.passable_list
+
+    result = []
+    while len(result) < count:
+        start, end = rand.randrange(w * h), rand.randrange(w * h)
+        if (passable[start] and passable[end] and
+            helper.manhattan_dist(positions[start], positions[end]) >= w // 2):
+            result.append((start, end))
+
+    return result
+
+def run(size, count):
+    """
+    Times the hierarchy and flat A* on a size x size map and prints the
+    results.
+    """
+    tile_map = generated_map(size)
+    profile = movement.profile_for(Artillery(team = 0))
+    grids = tile_map.profile_grids(profile)
+    cost = grids.cost_list.__getitem__
+    passable = grids.passable_list.__getitem__
+
+    start_time = time.perf_counter()
+    hierarchy = tile_map.hierarchy(profile)
+    build_time = time.perf_counter() - start_time
+
+    # Flip a tile in the middle of the map back and forth
+    middle = (size // 2, size // 2)
+    old_id = tile_map.get_tiles()[tile_map.index_of(middle)]
+    def flip():
+        tile_map.set_tile(middle, 1)
+        tile_map.set_tile(middle, old_id)
+    update_time = best_time(flip, 3) / 2
+
+    pairs = [(s, e) for s, e in queries(tile_map, grids, count)
+             if tile_map.can_reach(profile, s, e)]
+    flat_time = hpa_time = 0
+    ratio = 0
+    for s, e in pairs:
+        start_time = time.perf_counter()
+        flat = tiles.find_path_indexed(tile_map, s, e, cost, passable)
+        flat_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        path = hierarchy.find_path(s, e)
+        hpa_time += time.perf_counter() - start_time
+
+        ratio += hierarchy.path_cost(path) / hierarchy.path_cost(flat)
+
+    n = len(pairs)
+    print("{0:>4}x{0:<4} {1:>9.1f} {2:>9.2f} {3:>10.2f} {4:>10.2f} {5:>8.2f}x "
+          "{6:>8.3f}".format(
+        size, build_time * 1000, update_time * 1000, flat_time / n * 1000,
+        hpa_time / n * 1000, flat_time / hpa_time, ratio / n))
+
+def main():
+    print("{:<9} {:>9} {:>9} {:>10} {:>10} {:>9} {:>8}".format(
+        "map", "build ms", "update ms", "flat ms", "hpa ms", "speedup",
+        "cost"))
+    for size, count in ((32, 40), (64, 40), (128, 20), (256, 10), (512, 4)):
+        run(size, count)
+
+if __name__ == "__main__":
+    main()
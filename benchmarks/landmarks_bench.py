@@ -0,0 +1,73 @@
+"""
+Compares A* in tiles.find_path_indexed with the Manhattan distance heuristic
+against the landmark (ALT) heuristic from TileMap.landmarks, by the number of
+tiles expanded and the time taken per query. The time to pick the landmarks
+is reported separately, as it is only paid once per map and profile.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.landmarks_bench
+"""
+import time
+import tiles, movement
+from benchmarks.hpa_bench import queries
+from benchmarks.reachable_bench import generated_map
+from unit.artillery import Artillery
+
+def search(tile_map, pairs, cost, passable, heuristic = None):
+    """
+    Finds a path for each (start, end) pair. Returns a tuple of the total
+    number of tiles expanded, the total time taken and the path costs.
+    """
+    expanded = [0]
+    def counted_cost(i):
+        # The cost of a tile is looked up once each time it is expanded
+        expanded[0] += 1
+        return cost(i)
+
+    costs = []
+    start_time = time.perf_counter()
+    for s, e in pairs:
+        path = tiles.find_path_indexed(
+            tile_map, s, e, counted_cost, passable, heuristic)
+        costs.append(sum(cost(i) for i in path[:-1]))
+
+    return (expanded[0], time.perf_counter() - start_time, costs)
+
+def run(name, tile_map, count):
+    """
+    Runs both heuristics over count long queries and prints the results.
+    """
+    profile = movement.profile_for(Artillery(team = 0))
+    grids = tile_map.profile_grids(profile)
+    cost = grids.cost_list.__getitem__
+    passable = grids.passable_list.__getitem__
+
+    pairs = [(s, e) for s, e in queries(tile_map, grids, count)
+             if tile_map.can_reach(profile, s, e)]
+
+    start_time = time.perf_counter()
+    alt = tile_map.landmarks(profile)
+    build_time = time.perf_counter() - start_time
+
+    plain = search(tile_map, pairs, cost, passable)
+    with_alt = search(tile_map, pairs, cost, passable, alt.heuristic)
+    assert plain[2] == with_alt[2]
+
+    n = len(pairs)
+    print("{:<10} {:>9.1f} {:>10.0f} {:>10.0f} {:>10.2f} {:>10.2f}".format(
+        name, build_time * 1000, plain[0] / n, with_alt[0] / n,
+        plain[1] / n * 1000, with_alt[1] / n * 1000))
+
+def main():
+    island = tiles.TileMap("assets/tiles.png", 20, 20)
+    island.load_from_file("maps/island.gif")
+
+    print("{:<10} {:>9} {:>10} {:>10} {:>10} {:>10}".format(
+        "map", "build ms", "expanded", "alt exp.", "ms", "alt ms"))
+    run("island", island, 40)
+    for size, count in ((64, 40), (128, 20), (256, 10)):
+        run("{0}x{0}".format(size), generated_map(size), count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compares pqueue.PQueue against the recursive queue it replaced.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.pqueue_bench
+"""
+import random
+import pqueue, helper
+from benchmarks import best_time
+from benchmarks.legacy_pqueue import RecursivePQueue
+
+def push_pop(queue_class, priorities):
+    """
+    Pushes every priority then pops them all. Returns the operation count.
+    """
+    q = queue_class()
+    for i, p in enumerate(priorities):
+        q.update(i, p)
+    while q:
+        q.pop_smallest()
+
+    return 2 * len(priorities)
+
+def decrease_key(queue_class, updates):
+    """
+    Replays a Dijkstra-like mix of inserts, priority decreases and pops.
+    Returns the operation count.
+    """
+    q = queue_class()
+    for key, p in updates:
+        q.update(key, p)
+        if len(q) > 64:
+            q.pop_smallest()
+    ops = len(updates)
+    while q:
+        q.pop_smallest()
+        ops += 1
+
+    return ops
+
+def tie_broken(queue_class, keys, start, end):
+    """
+    Pushes tiles with equal priorities so that every comparison has to use the
+    straight line tie-break, then pops them all. Returns the operation count.
+    """
+    better = lambda a, b: (
+        (round(helper.squared_segment_dist(a, start, end), 3), a[1], a[0]) <
+        (round(helper.squared_segment_dist(b, start, end), 3), b[1], b[0]))
+
+    q = queue_class()
+    q.tie_breaker = better
+    for i, k in enumerate(keys):
+        q.update(k, i % 4)
+    while q:
+        q.pop_smallest()
+
+    return 2 * len(keys)
+
+def tie_keyed(keys, start, end):
+    """
+    The same workload as tie_broken, using a precomputed tie key.
+    """
+    q = pqueue.PQueue(tie_key = lambda a: (
+        round(helper.squared_segment_dist(a, start, end), 3), a[1], a[0]))
+    for i, k in enumerate(keys):
+        q.update(k, i % 4)
+    while q:
+        q.pop_smallest()
+
+    return 2 * len(keys)
+
+def report(name, old, new):
+    """
+    Prints the operations per second of both queues for a workload. Both
+    arguments are functions taking no arguments and returning an op count.
+    """
+    ops = old()
+    old_rate = ops / best_time(old)
+    new_rate = ops / best_time(new)
+    print("{:<14} {:>12,.0f} {:>12,.0f} {:>8.2f}x".format(
+        name, old_rate, new_rate, new_rate / old_rate))
+
+def main():
+    rand = random.Random(297)
+    n = 20000
+
+    priorities = [rand.random() for i in range(n)]
+    updates = [(rand.randrange(n // 4), rand.randrange(1000))
+               for i in range(n)]
+    keys = [(x, y) for x in range(100) for y in range(100)]
+    rand.shuffle(keys)
+
+    print("{:<14} {:>12} {:>12} {:>9}".format(
+        "workload", "old ops/s", "new ops/s", "speedup"))
+    report("push/pop",
+           lambda: push_pop(RecursivePQueue, priorities),
+           lambda: push_pop(pqueue.PQueue, priorities))
+    report("decrease-key",
+           lambda: decrease_key(RecursivePQueue, updates),
+           lambda: decrease_key(pqueue.PQueue, updates))
+    report("tie-break",
+           lambda: tie_broken(RecursivePQueue, keys, (0, 0), (99, 60)),
+           lambda: tie_broken(pqueue.PQueue, keys, (0, 0), (99, 60)))
+    report("tie-key",
+           lambda: tie_broken(RecursivePQueue, keys, (0, 0), (99, 60)),
+           lambda: tie_keyed(keys, (0, 0), (99, 60)))
+
+if __name__ == "__main__":
+    main()
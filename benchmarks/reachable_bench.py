@@ -0,0 +1,81 @@
+"""
+Compares the heap and bucket queue engines of tiles.reachable_indexed, on
+maps/island.lvl and on larger generated maps.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.reachable_bench
+"""
+import random
+import tiles, movement, reach
+from benchmarks import best_time
+from unit.jeep import Jeep
+from unit.artillery import Artillery
+
+def generated_map(size, seed = 297):
+    """
+    Returns a size x size TileMap of random land terrain with some walls and
+    water.
+    """
+    rand = random.Random(seed)
+    weights = {0: 40, 1: 5, 2: 10, 3: 10, 4: 15, 5: 10, 6: 10}
+    ids = [t for t, w in weights.items() for i in range(w)]
+
+    t = tiles.TileMap("assets/tiles.png", 20, 20)
+    t.load_from_list([rand.choice(ids) for i in range(size * size)],
+                     size,
+                     size)
+    return t
+
+def run(name, tile_map, unit, max_cost):
+    """
+    Times both engines for the given unit's profile from the middle of the map
+    and prints the results.
+    """
+    profile = movement.profile_for(unit)
+    grids = tile_map.profile_grids(profile)
+    cost = grids.cost_list.__getitem__
+    passable = grids.passable_list.__getitem__
+    resolution = reach.profile_resolution(profile)
+
+    # start from the passable tile closest to the middle
+    w, h = tile_map.terrain.shape[1], tile_map.terrain.shape[0]
+    start = min((i for i, p in enumerate(grids.passable_list) if p),
+                key = lambda i: abs(i % w - w // 2) + abs(i // w - h // 2))
+
+    heap = lambda: tiles.reachable_indexed(
+        tile_map, start, max_cost, cost, passable, True)
+    buckets = lambda: tiles.reachable_indexed(
+        tile_map, start, max_cost, cost, passable, True, resolution)
+
+    # make sure the engines agree
+    a, b = heap(), buckets()
+    assert a[0] == b[0] and a[1].costs == b[1].costs
+
+    heap_time = best_time(heap, 3)
+    bucket_time = best_time(buckets, 3)
+    print("{:<26} {:>8} {:>10.2f} {:>10.2f} {:>8.2f}x".format(
+        name, len(a[0]), heap_time * 1000, bucket_time * 1000,
+        heap_time / bucket_time))
+
+def main():
+    jeep = Jeep(team = 0)
+    artillery = Artillery(team = 0)
+
+    island = tiles.TileMap("assets/tiles.png", 20, 20)
+    island.load_from_file("maps/island.gif")
+
+    print("{:<26} {:>8} {:>10} {:>10} {:>9}".format(
+        "map/profile/budget", "reached", "heap ms", "bucket ms", "speedup"))
+    run("island/jeep/100", island, jeep, 100)
+    run("island/artillery/6", island, artillery, 6)
+    run("island/artillery/100", island, artillery, 100)
+
+    for size in (64, 128, 256, 512):
+        tile_map = generated_map(size)
+        run("{0}x{0}/jeep/100".format(size), tile_map, jeep, 100)
+        run("{0}x{0}/artillery/{1}".format(size, size * 4),
+            tile_map, artillery, size * 4)
+
+if __name__ == "__main__":
+    main()
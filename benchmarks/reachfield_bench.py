@@ -0,0 +1,70 @@
+"""
+Compares repairing a reachfield.ReachField after one tile changes whether it
+is passable (as when a unit moves next to another) against searching again
+with tiles.reachable_indexed, for increasing movement budgets on a generated
+map.
+
+Run from the repository root with:
+
+    python3 -m benchmarks.reachfield_bench
+"""
+import random, time
+import tiles, movement, reach, reachfield
+from benchmarks.reachable_bench import generated_map
+from unit.artillery import Artillery
+
+def run(tile_map, max_cost, count, seed = 297):
+    """
+    Blocks and unblocks count random tiles within reach of the middle of the
+    map one at a time, timing the repair and a fresh search after each, and
+    prints the results.
+    """
+    profile = movement.profile_for(Artillery(team = 0))
+    grids = tile_map.profile_grids(profile)
+    cost = grids.cost_list.__getitem__
+    blocked = set()
+    passable = lambda i: grids.passable_list[i] and i not in blocked
+    resolution = reach.profile_resolution(profile)
+
+    # start from the tile closest to the middle of the largest open area
+    w, h = tile_map.get_map_size()
+    components = tile_map.components(profile)
+    start = min((i for i, p in enumerate(grids.passable_list) if p),
+                key = lambda i: (-components.size(i),
+                                 abs(i % w - w // 2) + abs(i // w - h // 2)))
+    field = reachfield.ReachField(
+        tile_map, start, max_cost, cost, passable, resolution)
+
+    rand = random.Random(seed)
+    tiles_in_reach = sorted(field.reachable - {start})
+    size = len(tiles_in_reach)
+    repair_time = search_time = 0
+    for i in range(count):
+        changed = rand.choice(tiles_in_reach)
+        blocked.symmetric_difference_update([changed])
+
+        start_time = time.perf_counter()
+        field.repair([changed])
+        repair_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        reachable = tiles.reachable_indexed(
+            tile_map, start, max_cost, cost, passable, False, resolution)
+        search_time += time.perf_counter() - start_time
+
+        assert field.reachable == reachable
+
+    print("{:>6} {:>9} {:>10.3f} {:>10.3f} {:>8.1f}x".format(
+        max_cost, size, search_time / count * 1000,
+        repair_time / count * 1000, search_time / repair_time))
+
+def main():
+    tile_map = generated_map(128)
+
+    print("{:>6} {:>9} {:>10} {:>10} {:>9}".format(
+        "budget", "reachable", "search ms", "repair ms", "speedup"))
+    for max_cost in (6, 12, 24, 48):
+        run(tile_map, max_cost, 200)
+
+if __name__ == "__main__":
+    main()
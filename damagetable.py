@@ -0,0 +1,144 @@
+import numpy as np
+import rules, gamestate, unittable
+
+# The largest defense bonus of any tile type
+MAX_DEFENSE_BONUS = max(t.defense_bonus for t in rules.tile_types.values())
+
+# A tile with each defense bonus. Only the bonus matters to get_defense.
+_bonus_tiles = [rules.tile_types[0]._replace(defense_bonus = b)
+                for b in range(MAX_DEFENSE_BONUS + 1)]
+
+def _build():
+    """
+    Returns a tuple of the damage table, the attack table, the known flags
+    (see below) and a sample unit of every known class by class ID, worked
+    out with rules.get_damage and rules.attack_damage on the sample units.
+    """
+    game = gamestate.GameState([], 0, 0, 1)
+    samples = {}
+    for spec in rules.UNIT_SPECS.values():
+        sample = game.new_unit(spec, 0)
+        samples[sample.class_id] = sample
+
+    n = len(unittable.UnitTable.classes)
+    damage = np.zeros((n, n, len(_bonus_tiles)), dtype = np.int32)
+    attack = np.zeros((n, n), dtype = np.int32)
+    known = np.zeros(n, dtype = bool)
+    for a, attacker in samples.items():
+        known[a] = True
+        for t, target in samples.items():
+            attack[a, t] = rules.attack_damage(attacker, target)
+            for b, tile in enumerate(_bonus_tiles):
+                damage[a, t, b] = rules.get_damage(attacker, target, tile)
+
+    damage.flags.writeable = False
+    attack.flags.writeable = False
+    known.flags.writeable = False
+    return damage, attack, known, samples
+
+# The damage one unit does to another, indexed by [attacker class ID, target
+# class ID, defense bonus of the target's tile]. Class IDs are those of
+# unittable.UnitTable, so they can be read from the class_id column of any
+# game's table. known says which class IDs the table covers: the specs in
+# rules.UNIT_SPECS, with the stats they set up. It is 0 wherever
+# rules.get_damage is 0, including where the attacker can't hit the target
+# at all.
+# ATTACK is the same without the target's defense, indexed by [attacker class
+# ID, target class ID] (see rules.attack_damage).
+TABLE, ATTACK, known, _samples = _build()
+
+def lookup(attacker, target, target_tile):
+    """
+    Returns the damage attacker would do to target standing on target_tile,
+    the same as rules.get_damage(attacker, target, target_tile). Both are
+    gamestate.UnitStates. Units of classes the table doesn't cover are passed
+    on to rules.get_damage.
+
+    Matches rules.get_damage for every pair of classes on every type of tile:
+    >>> samples = list(_samples.values())
+    >>> all(lookup(a, t, tile) == rules.get_damage(a, t, tile)
+    ...     for a in samples for t in samples
+    ...     for tile in rules.tile_types.values())
+    True
+    """
+    a, t = attacker.class_id, target.class_id
+    if a >= len(known) or t >= len(known) or not (known[a] and known[t]):
+        return rules.get_damage(attacker, target, target_tile)
+
+    return int(TABLE[a, t, target_tile.defense_bonus])
+
+def by_defense_bonus(attacker, target):
+    """
+    Returns a tuple of the damage attacker would do to target on a tile of
+    each defense bonus from 0 to MAX_DEFENSE_BONUS. Indexing a NumPy array of
+    it with a map of the defense bonus of every tile gives the damage on
+    every tile of the map.
+
+    >>> game = gamestate.GameState([], 0, 0, 2)
+    >>> tank = rules.UNIT_SPECS["Tank"]
+    >>> by_defense_bonus(game.new_unit(tank, 0), game.new_unit(tank, 1))
+    (3, 2, 1)
+    """
+    return tuple(lookup(attacker, target, tile) for tile in _bonus_tiles)
+
+def max_attack(attacker):
+    """
+    Returns the most damage attacker could do to a unit of any class the
+    table covers, before the target's defense. Units of classes the table
+    doesn't cover are scored against a sample unit of every class it does.
+
+    >>> game = gamestate.GameState([], 0, 0, 2)
+    >>> tank = game.new_unit(rules.UNIT_SPECS["Tank"], 0)
+    >>> aa = game.new_unit(rules.UNIT_SPECS["Anti-Air"], 0)
+    >>> max_attack(tank), max_attack(aa)
+    (6, 9)
+    """
+    a = attacker.class_id
+    if a < len(known) and known[a]:
+        return int(ATTACK[a].max())
+
+    return max(rules.attack_damage(attacker, target)
+               for target in _samples.values())
+
+def damages(attacker_ids, target_ids, defense_bonuses):
+    """
+    Returns a NumPy array of the damage done by each attacker to each target,
+    given arrays of attacker class IDs, target class IDs and the defense
+    bonuses of the targets' tiles. The arrays are broadcast against each
+    other, so every attacker can be scored against every target at once.
+    Every class ID must be known.
+
+    Every unit type against every other on every type of tile:
+    >>> ids = np.nonzero(known)[0]
+    >>> bonuses = [t.defense_bonus for t in rules.tile_types.values()]
+    >>> grid = damages(ids[:, None, None], ids[None, :, None], bonuses)
+    >>> grid.shape == (len(ids), len(ids), len(rules.tile_types))
+    True
+    >>> units = [_samples[i] for i in ids]
+    >>> tile_list = list(rules.tile_types.values())
+    >>> all(grid[i, j, k] == rules.get_damage(a, t, tile)
+    ...     for i, a in enumerate(units) for j, t in enumerate(units)
+    ...     for k, tile in enumerate(tile_list))
+    True
+
+    The damage of the units of a game, read from its unit table:
+    >>> game = gamestate.GameState.load_level("maps/island.lvl")
+    >>> table = game.table
+    >>> rows = table.rows()
+    >>> ids = table.column('class_id')[rows]
+    >>> xs = table.column('x')[rows].astype(int)
+    >>> ys = table.column('y')[rows].astype(int)
+    >>> bonus = np.array([game.tile_at(pos).defense_bonus
+    ...                   for pos in zip(xs.tolist(), ys.tolist())])
+    >>> got = damages(ids[:, None], ids[None, :], bonus[None, :])
+    >>> units = [game.unit_at(pos) for pos in zip(xs.tolist(), ys.tolist())]
+    >>> got.tolist() == [[rules.get_damage(a, u, game.tile_at(u.pos))
+    ...                   for u in units] for a in units]
+    True
+    """
+    return TABLE[np.asarray(attacker_ids), np.asarray(target_ids),
+                 np.asarray(defense_bonuses)]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
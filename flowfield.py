@@ -0,0 +1,138 @@
+import math
+import numpy as np
+import landmarks, tiles
+
+class FlowField:
+    """
+    The cheapest way to one goal tile from every tile on the map, for one
+    movement profile, worked out with a single backward search from the goal.
+    Once built, the path of any number of units to the goal can be read off
+    in time proportional to its length.
+
+    distance is an array indexed by [y, x] holding the cost of getting from
+    each tile to the goal (infinity where the goal can't be reached), and
+    next_step holds the index of the tile to move to next from each tile (-1
+    at the goal and where it can't be reached).
+
+    Where there is a choice of equally cheap tiles, the tile closest to the
+    straight line to the goal is preferred, as in find_path. next_step takes
+    the line from each tile, while path takes the line from the start of the
+    path, so both agree on the first step.
+
+    Only terrain is taken into account, so other units may still be in the
+    way. Flow fields are normally made with TileMap.flow_field, which keeps
+    them until the terrain changes.
+
+    >>> from collections import namedtuple
+    >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+    >>> ground = Profile((1, 1, 1, 1.5, 1, 4, 2), (1, 0, 0, 1, 1, 1, 1))
+    >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/test-2.gif")
+    >>> field = FlowField(t, ground, t.index_of((4, 4)))
+    >>> field.path((0, 0))
+    [(0, 0), (1, 0), (1, 1), (2, 1), (2, 2), (3, 2), (3, 3), (4, 3), (4, 4)]
+    >>> field.path((0, 0)) == tiles.find_path(t, (0, 0), (4, 4))
+    True
+    >>> float(field.distance[0, 0]), int(field.next_step[0, 0])
+    (8.0, 1)
+
+    Costs which floats can't hold exactly still give a path from every tile
+    which can reach the goal, costing what distance says:
+    >>> odd = Profile((1.1, 1, 1, 1.3, 1, 2.7, 1.7), (1, 0, 0, 1, 1, 1, 1))
+    >>> t.load_from_file("maps/island.gif")
+    >>> field = FlowField(t, odd, t.index_of((12, 12)))
+    >>> paths = [(i, field.path_from(i)) for i in range(len(t.positions))
+    ...          if field.cost_from(i) is not None]
+    >>> len(paths) > 400 and all(
+    ...     math.isclose(sum(field._cost[n] for n in path[:-1]),
+    ...                  field.cost_from(i)) for i, path in paths)
+    True
+    """
+    def __init__(self, graph, profile, goal):
+        """
+        graph: the TileMap to find paths on
+        profile: the movement profile whose terrain rules to use
+        goal: the index of the tile to find paths to
+        """
+        grids = graph.profile_grids(profile)
+        self._graph = graph
+        self._cost = grids.cost_list[:]
+        self._passable = grids.passable_list[:]
+        self.goal = goal
+
+        # The cost from every tile to the goal. This is found for impassable
+        # tiles too, as a path may start on one.
+        self._distance = landmarks.distances(
+            graph, goal, self._cost, self._passable, reverse = True)
+
+        coords = graph._coords
+        goal_pos = coords[goal]
+        next_step = [-1] * len(self._distance)
+        for i, d in enumerate(self._distance):
+            if i != goal and d != math.inf:
+                next_step[i] = self._best_step(i, coords[i], goal_pos)
+
+        w, h = graph.get_map_size()
+        self.distance = np.array(self._distance).reshape((h, w))
+        self.next_step = np.array(next_step).reshape((h, w))
+
+    def _best_step(self, i, start_pos, goal_pos):
+        """
+        Returns the neighbour of tile index i to move to next on a cheapest
+        path to the goal, preferring the tile closest to the line between
+        start_pos and goal_pos.
+        """
+        coords = self._graph._coords
+        passable, distance = self._passable, self._distance
+        remaining = distance[i] - self._cost[i]
+
+        # The neighbours from which the rest of the way costs what is left
+        # after leaving this tile. The costs are sums of floats, which may
+        # have been added up in a different order, so they are only close.
+        options = [n for n in self._graph._adjacency[i]
+                   if passable[n] and math.isclose(distance[n], remaining,
+                                                   rel_tol = 1e-9,
+                                                   abs_tol = 1e-9)]
+        return min(options, key = lambda n:
+                   tiles.tie_key(coords[n], start_pos, goal_pos))
+
+    def cost_from(self, start):
+        """
+        Returns the cost of the cheapest path from the given tile index to the
+        goal, or None if there is none.
+        """
+        d = self._distance[start]
+        return None if d == math.inf else d
+
+    def path_from(self, start):
+        """
+        Returns the cheapest path from the given tile index to the goal as a
+        list of tile indices, or an empty list if there is none.
+        """
+        if self._distance[start] == math.inf:
+            return []
+
+        coords = self._graph._coords
+        start_pos, goal_pos = coords[start], coords[self.goal]
+
+        path = [start]
+        while path[-1] != self.goal:
+            path.append(self._best_step(path[-1], start_pos, goal_pos))
+
+        return path
+
+    def path(self, start_pos):
+        """
+        Returns the same path as path_from, taking and returning (x, y) tile
+        coordinates.
+        """
+        start = self._graph.index_of(start_pos)
+        if start < 0:
+            return []
+
+        coords = self._graph._coords
+        return [coords[i] for i in self.path_from(start)]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
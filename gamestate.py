@@ -0,0 +1,745 @@
+import math, weakref
+import numpy as np
+import helper, rules, gifreader, reach, reachfield, lrucache, unittable
+
+# Offsets of every tile within each (min range, max range) of a tile, as a
+# tuple of x and y offset arrays
+_range_stencils = {}
+
+def range_stencil(min_range, max_range):
+    """
+    Returns a tuple of arrays of the x and y offsets of every tile whose
+    Manhattan distance from (0, 0) is between min_range and max_range
+    (inclusive). These are only worked out once for each pair of ranges.
+
+    >>> dx, dy = range_stencil(1, 1)
+    >>> sorted(zip(dx.tolist(), dy.tolist()))
+    [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    >>> len(range_stencil(0, 2)[0]), len(range_stencil(3, 5)[0])
+    (13, 48)
+    """
+    stencil = _range_stencils.get((min_range, max_range))
+
+    if stencil is None:
+        r = max(max_range, 0)
+        dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+        dist = np.abs(dx) + np.abs(dy)
+        ring = (dist >= min_range) & (dist <= max_range)
+        stencil = (dx[ring], dy[ring])
+        _range_stencils[(min_range, max_range)] = stencil
+
+    return stencil
+
+def _column(name, convert = None):
+    """
+    Returns a property reading and writing the given column of a unit's row
+    of its game's table, passing values read through convert if given.
+    """
+    def get(self):
+        value = getattr(self._table, name)[self._row]
+        return value if convert is None else convert(value)
+
+    def set(self, value):
+        getattr(self._table, name)[self._row] = value
+
+    return property(get, set)
+
+class UnitState:
+    """
+    One unit in a GameState: the rules of its kind (a rules.UnitSpec) and
+    everything about it which changes during a game. Its stats start out as
+    those of its spec, and are read from here by the rules module.
+
+    The unit's team, health, fuel, whether it's active and what it has done
+    this turn are read from and written to its row of the game's table (a
+    unittable.UnitTable), and its position is copied there, so that rules can
+    work on the columns of all units at once. The row is handed back once the
+    unit is gone.
+
+    pos is the unit's (x, y) tile position, or None if it hasn't been put on
+    the map. GameState.place and GameState.move change it. fuel is None for
+    units which don't need fuel, and moved and attacked say what the unit has
+    done this turn. view is whatever shows the unit, such as its sprite (see
+    unit.base_unit), or None.
+
+    >>> game = GameState.load_level("maps/island.lvl")
+    >>> jeep = game.unit_at((19, 20))
+    >>> jeep.health = 3
+    >>> int(game.table.health[jeep._row]), game.table.x[jeep._row]
+    (3, 19.0)
+    """
+    __slots__ = ('game', 'spec', 'type', 'max_health', 'speed', 'damage',
+                 'defense', 'min_atk_range', 'max_atk_range', 'view',
+                 '_table', '_row', '_pos', '__weakref__')
+
+    team = _column('team')
+    health = _column('health')
+    active = _column('active', bool)
+    moved = _column('moved', bool)
+    attacked = _column('attacked', bool)
+
+    def __init__(self, game, spec, team, pos = None):
+        """
+        game: the GameState the unit is in
+        spec: the rules.UnitSpec of the unit's kind
+        team: the number of the team the unit is on
+        pos: the unit's (x, y) tile position, or None
+        """
+        self.game = game
+        self.spec = spec
+        self.type = spec.type
+        self.max_health = spec.max_health
+        self.speed = spec.speed
+        self.damage = spec.damage
+        self.defense = spec.defense
+        self.min_atk_range = spec.min_atk_range
+        self.max_atk_range = spec.max_atk_range
+        self.view = None
+
+        self._table = game.table
+        self._row = game.table.add(spec)
+        weakref.finalize(self, game.table.release, self._row)
+
+        self.team = team
+        self.health = spec.max_health
+        self.fuel = spec.max_fuel
+        self._place(pos)
+
+    @property
+    def pos(self):
+        """
+        The unit's (x, y) tile position, or None.
+        """
+        return self._pos
+
+    def _place(self, pos):
+        """
+        Sets the unit's position, and copies it into its row.
+        """
+        self._pos = pos
+        x, y = (math.nan, math.nan) if pos is None else pos
+        self._table.x[self._row] = x
+        self._table.y[self._row] = y
+
+    @property
+    def class_id(self):
+        """
+        The ID of the unit's class (its spec) in unittable.UnitTable.
+        """
+        return self._table.class_id[self._row]
+
+    @property
+    def fuel(self):
+        """
+        The unit's remaining fuel, or None if it doesn't need fuel.
+        """
+        if self.spec.max_fuel is None:
+            return None
+        return self._table.fuel[self._row]
+
+    @fuel.setter
+    def fuel(self, fuel):
+        self._table.fuel[self._row] = 0 if fuel is None else fuel
+
+    def __repr__(self):
+        return "<UnitState {} of team {} at {}>".format(
+            self.type, self.team, self.pos)
+
+class GameState:
+    """
+    A whole game (the map, the units and whose turn it is) and the actions
+    players can take in it, without any graphics. This is the one copy of the
+    game: the GUI plays it through these methods, and its unit sprites are
+    views of the UnitStates here. Neither this nor the modules it uses need
+    pygame, so games can be simulated without a display.
+
+    Units are moved straight to where they are sent, and move returns the
+    path for anything showing the move to play out.
+
+    >>> game = GameState.load_level("maps/island.lvl")
+    >>> game.num_teams, game.cur_team, len(game.team_units(1))
+    (2, 0, 12)
+    >>> jeep = game.unit_at((19, 20))
+    >>> jeep
+    <UnitState Jeep of team 0 at (19, 20)>
+    >>> len(game.move_targets(jeep))
+    115
+    >>> path = game.move(jeep, (14, 15))
+    >>> path[0], path[-1], len(path)
+    ((19, 20), (14, 15), 11)
+    >>> game.attack_targets(jeep)
+    {}
+    >>> game.end_turn() is None
+    True
+    >>> artillery = game.unit_at((9, 10))
+    >>> path = game.move(artillery, (12, 12))
+    >>> game.attack_targets(artillery)
+    {(14, 15): 6}
+    >>> game.attack(artillery, (14, 15))
+    6
+    >>> jeep.health
+    4
+    >>> game.end_turn() is None
+    True
+
+    Aircraft have to move or dock before their turn can end:
+    >>> path = game.move(game.unit_at((27, 27)), (27, 24))
+    >>> game.end_turn()
+    <UnitState Bomber of team 0 at (27, 26)>
+    >>> game.cur_team
+    0
+    """
+    def __init__(self, tiles, width, height, num_teams):
+        """
+        tiles: the tile IDs of the map in row order
+        width, height: the size of the map in tiles
+        num_teams: the number of teams taking turns
+        """
+        self.width = width
+        self.height = height
+        self._tile_ids = list(tiles)
+        self._tiles = [rules.tile_types[t] for t in tiles]
+        self.num_teams = num_teams
+
+        # The number of turns taken so far, and the team which has won
+        self.turn = 0
+        self.winner = None
+
+        # The changing state of every unit, a row each (see UnitState)
+        self.table = unittable.UnitTable()
+
+        # Active units by team, in the order they were added, as dictionaries
+        # with None values used as ordered sets
+        self._rosters = {}
+
+        # Active units by tile position, in the order they arrived
+        self._occupancy = {}
+
+        # Goes up by one whenever the occupancy index changes (a unit is
+        # activated or deactivated, or arrives at or leaves a tile), so that
+        # anything worked out from unit positions can tell whether it is out
+        # of date
+        self.occupancy_version = 0
+
+        # For each team, how many of its docking units each tile is a docking
+        # tile of (see rules.docking_area)
+        self._docking = {}
+
+        # The graph the search functions of the reach module work on
+        self._grid = reach.Grid(width, height)
+
+        # Compiled terrain rules by movement profile (see _profile_grids)
+        self._grids = {}
+
+        # Each unit's reachfield.ReachField from its last move_range search,
+        # as a tuple of what the field was built for, the occupancy version
+        # and occupancy index it was last repaired against, and the field. A
+        # unit's field is dropped when it is deactivated.
+        self._fields = lrucache.LRUCache(256)
+
+    @classmethod
+    def load_level(cls, filename):
+        """
+        Returns a new game of the level file with the given name.
+        """
+        level = rules.read_level(filename)
+
+        game = cls.for_level(level)
+        for placement in level.units:
+            game.add_unit(placement.name, placement.team,
+                          (placement.x, placement.y))
+
+        return game
+
+    @classmethod
+    def for_level(cls, level):
+        """
+        Returns a new game on the map of the given rules.Level, with none of
+        the level's units added yet.
+        """
+        width, height, tiles = gifreader.read_indices(level.map_file)
+        return cls(tiles, width, height, level.num_teams)
+
+    @property
+    def cur_team(self):
+        """
+        The team whose turn it is.
+        """
+        return self.turn % self.num_teams
+
+    @property
+    def cur_day(self):
+        """
+        The current day, starting from 1. Every team has a turn each day.
+        """
+        return self.turn // self.num_teams + 1
+
+    def tile_at(self, pos):
+        """
+        Returns the rules.Tile at the given position, or None if it is off the
+        map.
+        """
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        return self._tiles[y * self.width + x]
+
+    def new_unit(self, spec, team, pos = None):
+        """
+        Returns the UnitState of a new unit with the given rules.UnitSpec. It
+        isn't in play until it is activated.
+        """
+        return UnitState(self, spec, team, pos)
+
+    def add_unit(self, name, team, pos):
+        """
+        Adds a unit of the kind with the given name (a key of
+        rules.UNIT_SPECS) to the game, and returns its UnitState.
+        """
+        unit = self.new_unit(rules.UNIT_SPECS[name], team, pos)
+        self.activate(unit)
+        return unit
+
+    def activate(self, unit):
+        """
+        Puts the unit into play, on its team's roster and (if it has a
+        position) on the map.
+
+        >>> game = GameState([0] * 25, 5, 5, 2)
+        >>> a = game.add_unit("Jeep", 0, (1, 1))
+        >>> b = game.new_unit(a.spec, 0)
+        >>> game.activate(b)
+        >>> list(game.team_units(0)) == [a, b], game.unit_at((1, 1)) is a
+        (True, True)
+        >>> game.deactivate(a)
+        >>> list(game.team_units(0)) == [b], game.unit_at((1, 1))
+        (True, None)
+        """
+        if unit.active:
+            return
+
+        unit.active = True
+        self._rosters.setdefault(unit.team, {})[unit] = None
+        self._arrive(unit)
+
+    def deactivate(self, unit):
+        """
+        Takes the unit out of play, as when it is destroyed.
+        """
+        if not unit.active:
+            return
+
+        unit.active = False
+        del self._rosters[unit.team][unit]
+        self._leave(unit)
+        self._fields.pop(unit)
+
+    def place(self, unit, pos):
+        """
+        Puts the unit at the given position, without any of the rules of
+        moving (as when setting up a level).
+        """
+        if unit.active:
+            self._leave(unit)
+        unit._place(pos)
+        if unit.active:
+            self._arrive(unit)
+
+    def _arrive(self, unit):
+        """
+        Puts the unit into the occupancy and docking indices at its position.
+        """
+        if unit.pos is None:
+            return
+
+        self.occupancy_version += 1
+        self._occupancy.setdefault(unit.pos, []).append(unit)
+
+        if unit.spec.docking:
+            docking = self._docking.setdefault(unit.team, {})
+            for tile in rules.docking_area(unit.pos):
+                docking[tile] = docking.get(tile, 0) + 1
+
+    def _leave(self, unit):
+        """
+        Takes the unit out of the occupancy and docking indices.
+        """
+        if unit.pos is None:
+            return
+
+        self.occupancy_version += 1
+        units = self._occupancy[unit.pos]
+        units.remove(unit)
+        if not units:
+            del self._occupancy[unit.pos]
+
+        if unit.spec.docking:
+            docking = self._docking[unit.team]
+            for tile in rules.docking_area(unit.pos):
+                docking[tile] -= 1
+                if not docking[tile]:
+                    del docking[tile]
+
+    def unit_at(self, pos, layer = None):
+        """
+        Returns the active unit at the given position, or None if there is
+        none. If a collision layer is given, only a unit on that layer is
+        returned.
+        """
+        for unit in self._occupancy.get(pos, ()):
+            if layer is None or unit.spec.layer == layer:
+                return unit
+        return None
+
+    def team_units(self, team):
+        """
+        Returns a view of the given team's active units, in the order they
+        were added.
+        """
+        return self._rosters.get(team, {}).keys()
+
+    def enemy_count(self, team):
+        """
+        Returns the number of active units which aren't on the given team.
+        """
+        return sum(len(roster) for t, roster in self._rosters.items()
+                   if t != team)
+
+    def docking_tiles(self, team):
+        """
+        Returns a set-like view of the positions where aircraft of the given
+        team could dock with one of the team's units. It is kept up to date as
+        docking units are added, move and are destroyed.
+
+        >>> game = GameState.load_level("maps/island.lvl")
+        >>> carrier = game.unit_at((27, 27), "water")
+        >>> sorted(game.docking_tiles(0))
+        [(26, 27), (27, 26), (27, 27), (27, 28), (28, 27)]
+        >>> path = game.move(carrier, (25, 26))
+        >>> sorted(game.docking_tiles(0))
+        [(24, 26), (25, 25), (25, 26), (25, 27), (26, 26)]
+        >>> game.can_dock(0, (27, 27)), game.can_dock(1, (25, 26))
+        (False, False)
+        >>> game.deactivate(carrier)
+        >>> len(game.docking_tiles(0))
+        0
+        """
+        return self._docking.get(team, {}).keys()
+
+    def can_dock(self, team, pos):
+        """
+        Returns whether an aircraft of the given team at the given position
+        could dock with one of the team's units.
+        """
+        return pos in self._docking.get(team, ())
+
+    def is_blocked(self, unit, pos):
+        """
+        Returns whether an enemy unit on the unit's layer is at the given
+        position, which stops the unit from moving through it.
+        """
+        if unit.spec.layer is None:
+            return False
+
+        other = self.unit_at(pos, unit.spec.layer)
+        return bool(other and other.team != unit.team)
+
+    def is_passable(self, unit, pos):
+        """
+        Returns whether the unit could move over the given position: it is on
+        the map, the unit can cross its terrain and no enemy blocks it.
+        """
+        tile = self.tile_at(pos)
+        return bool(tile and rules.is_terrain_passable(unit.spec, tile) and
+                    not self.is_blocked(unit, pos))
+
+    def _profile_grids(self, profile):
+        """
+        Returns a tuple of lists of the cost of leaving each tile and whether
+        it can be moved over, for units with the given rules.MovementProfile,
+        indexed by y * width + x. These are only worked out once for each
+        profile, and are the same as a tiles.TileMap's ProfileGrids lists.
+        """
+        grids = self._grids.get(profile)
+
+        if grids is None:
+            cost = [profile.costs[t] for t in self._tile_ids]
+            passable = [profile.passable[t] for t in self._tile_ids]
+            grids = (cost, passable)
+            self._grids[profile] = grids
+
+        return grids
+
+    def move_range(self, unit):
+        """
+        Returns a tuple of the set of positions the unit could move through
+        with its speed, and the reach.SearchTree of the search. The tree's
+        path() method gives the path to any of them without searching again.
+        This includes the unit's own tile, and tiles it can pass through but
+        not stop on.
+
+        Each unit's last search is kept. When only other units have moved
+        since, it is repaired around the tiles where they arrived or left,
+        which gives the same result as a new search:
+        >>> game = GameState.load_level("maps/island.lvl")
+        >>> jeep = game.unit_at((19, 20))
+        >>> reachable, tree = game.move_range(jeep)
+        >>> game.place(game.unit_at((9, 10)), (17, 19))
+        >>> repaired, tree = game.move_range(jeep)
+        >>> _ = game._fields.pop(jeep)
+        >>> fresh, fresh_tree = game.move_range(jeep)
+        >>> repaired == fresh != reachable, tree.costs == fresh_tree.costs
+        (True, True)
+        """
+        profile = rules.movement_profile(unit.spec)
+        key = (profile, unit.team, unit.pos, unit.speed)
+        version = self.occupancy_version
+
+        entry = self._fields.get(unit)
+        if entry is None or entry[0] != key:
+            field = self._new_field(unit, profile)
+            occupancy = None
+        else:
+            occupancy, field = entry[2], entry[3]
+
+        if occupancy is None or entry[1] != version:
+            seen = occupancy
+            occupancy = {pos: tuple(units)
+                         for pos, units in self._occupancy.items()}
+
+            # Only tiles whose units changed can have changed whether they
+            # block
+            if seen is not None:
+                index = self._grid._tile_index
+                field.repair([index(pos)
+                              for pos in seen.keys() | occupancy.keys()
+                              if seen.get(pos) != occupancy.get(pos)])
+
+        self._fields.put(unit, (key, version, occupancy, field))
+
+        coords = self._grid._coords
+        return ({coords[i] for i in field.reachable}, field.tree())
+
+    def _new_field(self, unit, profile):
+        """
+        Returns a new reachfield.ReachField of the unit's moves from where it
+        stands, with the given rules.MovementProfile.
+
+        An air unit's field starts out as a diamond, even with enemy aircraft
+        in the way, which are then repaired around:
+        >>> game = GameState.load_level("maps/island.lvl")
+        >>> fighter = game.add_unit("Fighter", 0, (12, 12))
+        >>> for pos in ((12, 10), (15, 12), (9, 14)):
+        ...     _ = game.add_unit("Fighter", 1, pos)
+        >>> field = game._new_field(fighter, rules.movement_profile(
+        ...     fighter.spec))
+        >>> grid = game._grid
+        >>> reachable, tree = reach.reachable_indexed(
+        ...     grid, grid._tile_index((12, 12)), fighter.speed, lambda i: 1,
+        ...     lambda i: not game.is_blocked(fighter, grid._coords[i]), True)
+        >>> field.reachable == reachable, field.tree().costs == tree.costs
+        (True, True)
+        >>> all(field.tree().path_to(i) == tree.path_to(i) for i in reachable)
+        True
+        """
+        grid = self._grid
+        coords, occupancy = grid._coords, self._occupancy
+        cost, terrain_passable = self._profile_grids(profile)
+
+        def passable(i):
+            return terrain_passable[i] and not (
+                coords[i] in occupancy and self.is_blocked(unit, coords[i]))
+
+        # Units which can cross any terrain reach a diamond of tiles. Units
+        # blocking them within it are then repaired around, which only
+        # searches the tiles behind them.
+        step = reach.profile_open_cost(profile)
+        blockers = []
+        if step is not None:
+            radius = unit.speed // step
+            blockers = [grid._tile_index(pos) for pos in occupancy
+                        if 0 < helper.manhattan_dist(pos, unit.pos) <= radius
+                        and self.is_blocked(unit, pos)]
+
+        field = reachfield.ReachField(grid,
+                                      grid._tile_index(unit.pos),
+                                      unit.speed,
+                                      cost.__getitem__,
+                                      passable,
+                                      reach.profile_resolution(profile),
+                                      step)
+        if blockers:
+            field.repair(blockers)
+
+        return field
+
+    def is_stoppable(self, unit, pos):
+        """
+        Returns whether the unit could end a move at the given position, if it
+        could get there.
+        """
+        if not rules.can_stop(unit.spec, unit.pos, pos,
+                              self.can_dock(unit.team, pos)):
+            return False
+
+        # Can't park on a unit
+        if pos in self._occupancy:
+            return False
+
+        return self.is_passable(unit, pos)
+
+    def move_targets(self, unit):
+        """
+        Returns the set of positions the unit could move to.
+        """
+        return self._stoppable(unit, self.move_range(unit)[0])
+
+    def _stoppable(self, unit, reachable):
+        """
+        Returns the set of the given positions in the unit's move range which
+        it could stop on.
+        """
+        # Every tile in range but the unit's own can be entered, so only the
+        # rest of is_stoppable needs checking
+        spec, start = unit.spec, unit.pos
+        docks = self.docking_tiles(unit.team)
+        return {pos for pos in reachable
+                if pos not in self._occupancy and
+                rules.can_stop(spec, start, pos, pos in docks)}
+
+    def positions_in_range(self, unit, pos = None):
+        """
+        Returns the set of positions on the map which the unit could attack
+        from the given position (by default, where it stands), whether or not
+        there is anything there to attack.
+
+        >>> game = GameState.load_level("maps/island.lvl")
+        >>> jeep = game.unit_at((19, 20))
+        >>> sorted(game.positions_in_range(jeep, (0, 1)))
+        [(0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 1), (1, 2), (2, 1)]
+        >>> len(game.positions_in_range(game.unit_at((9, 10))))
+        48
+        """
+        if pos is None:
+            pos = unit.pos
+
+        dx, dy = range_stencil(*rules.range_bounds(unit, self.tile_at(pos)))
+        xs = dx + pos[0]
+        ys = dy + pos[1]
+
+        on_map = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        return set(zip(xs[on_map].tolist(), ys[on_map].tolist()))
+
+    def attack_targets(self, unit):
+        """
+        Returns a dictionary of the damage the unit would do to each unit it
+        could attack from where it is, keyed by position. Only the first unit
+        on a tile can be attacked.
+        """
+        min_range, max_range = rules.range_bounds(unit,
+                                                  self.tile_at(unit.pos))
+
+        targets = {}
+        for pos, units in self._occupancy.items():
+            target = units[0]
+            dist = helper.manhattan_dist(unit.pos, pos)
+            if (not min_range <= dist <= max_range or
+                target.team == unit.team or
+                not rules.can_hit(unit, target)):
+                continue
+
+            damage = rules.get_damage(unit, target, self.tile_at(pos))
+            if damage != 0:
+                targets[pos] = damage
+
+        return targets
+
+    def _check_turn(self, unit):
+        """
+        Raises a ValueError unless the given unit can act: the game isn't over
+        and it's the unit's team's turn.
+        """
+        if self.winner is not None:
+            raise ValueError("The game is over")
+        if not unit.active or unit.team != self.cur_team:
+            raise ValueError("{!r} can't act this turn".format(unit))
+
+    def move(self, unit, pos):
+        """
+        Moves the unit to the given position, which must be one of its move
+        targets, and returns the cheapest path there as a list of positions
+        from where it was. Each unit can move once a turn.
+        """
+        self._check_turn(unit)
+        if unit.moved:
+            raise ValueError("{!r} has already moved".format(unit))
+
+        reachable, tree = self.move_range(unit)
+        if pos not in self._stoppable(unit, reachable):
+            raise ValueError("{!r} can't move to {}".format(unit, pos))
+
+        path = tree.path(pos)
+
+        unit.moved = True
+        self.place(unit, pos)
+        return path
+
+    def attack(self, unit, pos):
+        """
+        Makes the unit attack the unit at the given position, which must be
+        one of its attack targets, and returns the damage done. Each unit can
+        attack once a turn. A team wins when it destroys the last of the
+        other teams' units.
+        """
+        self._check_turn(unit)
+        if unit.attacked:
+            raise ValueError("{!r} has already attacked".format(unit))
+
+        damage = self.attack_targets(unit).get(pos)
+        if damage is None:
+            raise ValueError("{!r} can't attack {}".format(unit, pos))
+
+        unit.attacked = True
+        target = self.unit_at(pos)
+        target.health -= damage
+
+        if target.health <= 0:
+            self.deactivate(target)
+            if not self.enemy_count(unit.team):
+                self.winner = unit.team
+
+        return damage
+
+    def end_turn(self):
+        """
+        Ends the current team's turn, refuelling or using up the fuel of its
+        aircraft, and returns None. If one of the team's units won't let the
+        turn end yet, nothing happens and that unit is returned instead.
+        """
+        if self.winner is not None:
+            raise ValueError("The game is over")
+
+        team = self.cur_team
+        for unit in self.team_units(team):
+            docked = self.can_dock(team, unit.pos)
+            if not rules.can_turn_end(unit.spec, unit.moved, docked):
+                return unit
+
+        # The roster is copied, as units can run out of fuel
+        for unit in list(self.team_units(team)):
+            unit.moved = unit.attacked = False
+
+            if unit.fuel is not None:
+                docked = self.can_dock(team, unit.pos)
+                unit.fuel = rules.fuel_after_turn(unit.spec, unit.fuel,
+                                                  docked)
+                if unit.fuel <= 0:
+                    unit.health -= unit.max_health
+                    self.deactivate(unit)
+
+        self.turn += 1
+        return None
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
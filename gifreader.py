@@ -0,0 +1,125 @@
+def read_indices(filename):
+    """
+    Returns a tuple of the width, height and palette index of every pixel (in
+    row order) of the first image in the GIF file with the given name. This
+    is the same as reading each pixel's mapped colour from the image loaded
+    with pygame, which TileMap.load_from_file does, but doesn't need pygame.
+
+    >>> read_indices("maps/test-1.gif") == (5, 5, [0, 1, 2, 3, 4, 5, 6] +
+    ...                                     [0] * 18)
+    True
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    if data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ValueError("{} is not a GIF file".format(filename))
+
+    # Skip the global colour table, if there is one
+    flags = data[10]
+    pos = 13
+    if flags & 0x80:
+        pos += 3 << ((flags & 7) + 1)
+
+    while True:
+        block = data[pos]
+        if block == 0x21:
+            # An extension, made up of sub-blocks after its label
+            pos = _skip_sub_blocks(data, pos + 2)
+        elif block == 0x2c:
+            break
+        else:
+            raise ValueError("{} has no image".format(filename))
+
+    # The image descriptor
+    width = data[pos + 5] | data[pos + 6] << 8
+    height = data[pos + 7] | data[pos + 8] << 8
+    flags = data[pos + 9]
+    pos += 10
+    if flags & 0x80:
+        pos += 3 << ((flags & 7) + 1)
+
+    # The image data is split into sub-blocks
+    min_code_size = data[pos]
+    compressed = bytearray()
+    pos += 1
+    while data[pos]:
+        compressed += data[pos + 1:pos + 1 + data[pos]]
+        pos += data[pos] + 1
+
+    pixels = _decompress(compressed, min_code_size, width * height)
+
+    # Interlaced images store every 8th row, then the rows in between
+    if flags & 0x40:
+        rows = []
+        for start, step in ((0, 8), (4, 8), (2, 4), (1, 2)):
+            rows += range(start, height, step)
+        ordered = [None] * height
+        for i, y in enumerate(rows):
+            ordered[y] = pixels[i * width:(i + 1) * width]
+        pixels = [p for row in ordered for p in row]
+
+    return (width, height, pixels)
+
+def _skip_sub_blocks(data, pos):
+    """
+    Returns the position just past the sub-blocks starting at pos.
+    """
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+def _decompress(compressed, min_code_size, count):
+    """
+    Returns a list of the first count values of the given GIF LZW data.
+    """
+    clear = 1 << min_code_size
+    stop = clear + 1
+
+    pixels = []
+    table = None
+    code_size = min_code_size + 1
+    prev = None
+
+    # Codes are packed least significant bit first
+    bits = 0
+    bit_count = 0
+    for byte in compressed:
+        bits |= byte << bit_count
+        bit_count += 8
+
+        while bit_count >= code_size:
+            code = bits & ((1 << code_size) - 1)
+            bits >>= code_size
+            bit_count -= code_size
+
+            if code == clear or table is None:
+                table = [[i] for i in range(clear)] + [None, None]
+                code_size = min_code_size + 1
+                prev = None
+                if code == clear:
+                    continue
+
+            if code == stop:
+                return pixels[:count]
+
+            if code < len(table):
+                entry = table[code]
+                if prev is not None:
+                    table.append(prev + entry[:1])
+            else:
+                # The code being defined by this very step
+                entry = prev + prev[:1]
+                table.append(entry)
+
+            pixels += entry
+            prev = entry
+
+            if len(table) == 1 << code_size and code_size < 12:
+                code_size += 1
+
+    return pixels[:count]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
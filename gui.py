@@ -1,7 +1,7 @@
 import sys, pygame
 from pygame.sprite import LayeredUpdates
 from collections import namedtuple
-import tiles, unit, animation
+import tiles, unit, animation, damagetable, rules, gamestate
 from unit import *
 from effects.explosion import Explosion
 from sounds import SoundManager
@@ -68,6 +68,31 @@ class GUI(LayeredUpdates):
     rendering objects on-screen (including converting unit tile 
     positions into on-screen positions). Essentially, it is the 
     middleman between objects and the actual tilemap.
+    
+    The game itself is a gamestate.GameState, which the GUI plays through
+    its moves, attacks and turn ends. The unit sprites are views of the
+    game's units, so a turn played through the game shows up on them:
+    >>> gui = GUI(pygame.Rect(0, 0, 800, 600), (0, 0, 0))
+    >>> gui.load_level("maps/island.lvl")
+    >>> game = gui.game
+    >>> jeep = gui.get_unit_at_tile_pos((19, 20))
+    >>> path = game.move(jeep.state, (14, 15))
+    >>> game.end_turn()
+    >>> artillery = game.unit_at((9, 10))
+    >>> path = game.move(artillery, (12, 12))
+    >>> game.attack(artillery, (14, 15))
+    6
+    >>> gui.update()
+    >>> jeep.tile_pos, jeep.health, jeep.turn_state
+    ((14, 15), 4, [False, False])
+    >>> artillery.view.tile_pos, artillery.view.turn_state, gui.cur_team
+    ((12, 12), [True, True], 1)
+    >>> gui.end_turn_pressed()
+    >>> artillery.view.turn_state, gui.cur_team, gui.cur_day
+    ([False, False], 0, 2)
+    >>> for u in list(base_unit.BaseUnit.active_units):
+    ...     u.deactivate()
+    >>> GUI.num_instances = 0
     """ 
     # number of GUI instances
     num_instances = 0
@@ -108,29 +133,8 @@ class GUI(LayeredUpdates):
         # If the unit has already moved nothing happens.
         elif self.sel_unit.turn_state[0] == True: return
         
-        # Determine where we can move.
-        pos = (self.sel_unit.tile_x, self.sel_unit.tile_y)
-        
-        # These will be used in pathfinding
-        cost = lambda c: (
-            self.sel_unit.move_cost(self.map.tile_data(c)))
-        passable = lambda c: (
-            self.sel_unit.is_passable(self.map.tile_data(c), c))
-        
-        reachable = tiles.reachable_tiles(
-            self.map,
-            pos,
-            self.sel_unit.speed,
-            cost,
-            passable)
-        
-        # Check that the tiles can actually be stopped in
-        for t_pos in reachable:
-            tile = self.map.tile_data(t_pos)
-            
-            # This can be stopped in, so add it
-            if self.sel_unit.is_stoppable(tile, t_pos):
-                self._movable_tiles.add(t_pos)
+        # Determine where we can move
+        self._movable_tiles = self.game.move_targets(self.sel_unit.state)
         
         # Highlight those squares
         self.map.set_highlight(
@@ -153,22 +157,12 @@ class GUI(LayeredUpdates):
         # If the unit has already attacked, nothing happens.
         elif self.sel_unit.turn_state[1] == True: return
         
-        # Get information about the unit and its location.
-        unit_pos = (self.sel_unit.tile_x, self.sel_unit.tile_y)
-        unit_tile = self.map.tile_data(unit_pos)
-        
-        # These are all the positions in range of the unit's attack.
-        in_range = self.sel_unit.positions_in_range(unit_tile, unit_pos)
+        # These are all the positions on the map in range of the unit's attack.
+        in_range = self.game.positions_in_range(self.sel_unit.state)
         
-        # Determine which tiles the unit can actually attack.
-        for check_pos in in_range:
-            check_tile = self.map.tile_data(check_pos)
-            if self.sel_unit.is_attackable(
-                unit_tile,
-                unit_pos,
-                check_tile,
-                check_pos):
-                self._attackable_tiles.add(check_pos)
+        # Determine which tiles the unit can actually attack, and the damage
+        # it would do to each.
+        self._attackable_tiles = self.game.attack_targets(self.sel_unit.state)
         
         # Highlight the attackable tiles
         self.map.set_highlight(
@@ -185,33 +179,30 @@ class GUI(LayeredUpdates):
         This is called when the end turn button is pressed.
         Advances to the next turn.
         """
-        # Check if the turn can actually end
-        for unit in base_unit.BaseUnit.active_units:
-            if unit.team == self.cur_team and not unit.can_turn_end():
-                
-                # Make sure the game mode is changed back to Select
-                self.change_mode(Modes.Select)
-                
-                # If not, switch to that unit
-                self.sel_unit = unit
-                return
+        # The team's units, as some may not survive their turn ending
+        units = list(self.game.team_units(self.cur_team))
         
-        # reset game mode
+        # End the turn in the game
+        blocker = self.game.end_turn()
+        
+        # Make sure the game mode is changed back to Select
         self.change_mode(Modes.Select)
         
+        # If the turn can't end yet, switch to the unit stopping it
+        if blocker is not None:
+            self.sel_unit = blocker.view
+            return
+        
         # unselect unit
         self.sel_unit = None
         
-        # Reset the turn states of all units
-        for unit in base_unit.BaseUnit.active_units:
-            # This is the current team's unit, so call its turn end function
-            if unit.team == self.cur_team and not unit.turn_ended():
-                    # The unit died! Add its death effect
-                    if unit.die_effect:
-                        self._effects.add(unit.die_effect(unit.rect.topleft))
-        
-        # advance turn
-        self.current_turn += 1
+        for state in units:
+            if not state.active:
+                # The unit died! Add its death effect
+                unit = state.view
+                if unit.die_effect:
+                    self._effects.add(unit.die_effect(unit.rect.topleft))
+                unit.sync()
 
     def __init__(self, screen_rect, bg_color):
         """
@@ -243,10 +234,8 @@ class GUI(LayeredUpdates):
         self.bg_color = bg_color
         self.map = None
 
-        # Set up team information
-        self.num_teams = None
-        self.current_turn = 0
-        self.win_team = None 
+        # The game being played, whose units the unit sprites show
+        self.game = None
 
         # The currently selected unit
         self.sel_unit = None
@@ -260,9 +249,10 @@ class GUI(LayeredUpdates):
         # We start in select mode
         self.mode = Modes.Select
         
-        # Tiles we can move to/attack
+        # Tiles we can move to, and the damage we'd do on each tile we can
+        # attack
         self._movable_tiles = set()
-        self._attackable_tiles = set()
+        self._attackable_tiles = {}
 
         # The targeting reticle
         self._reticle = animation.Animation("assets/reticle.png",
@@ -278,14 +268,14 @@ class GUI(LayeredUpdates):
         """
         Gets the current team based on the turn.
         """
-        return (self.current_turn) % self.num_teams
+        return self.game.cur_team
     
     @property
     def cur_day(self):
         """
         Gets the current day based on the turn.
         """
-        return (self.current_turn) // self.num_teams + 1
+        return self.game.cur_day
         
     def change_mode(self, new_mode):
         """
@@ -303,7 +293,7 @@ class GUI(LayeredUpdates):
         # Deal with the current mode
         if self.mode == Modes.ChooseAttack:
             # Reset the move markers
-            self._attackable_tiles = set()
+            self._attackable_tiles = {}
             self.map.remove_highlight("attack")
             
         self.mode = new_mode
@@ -314,100 +304,35 @@ class GUI(LayeredUpdates):
         """
         self.remove(self.map)
         
-        map_file = open(filename, 'r')
-        
-        # Move up to the line with the team count
-        line = map_file.readline()
-        while line.find("Teams: ") < 0:
-            line = map_file.readline()
-            if line == "":
-                raise Exception ("Expected team count")
-        
-        # Get the number of teams
-        line = line.lstrip("Teams: ")
-        self.num_teams = int(line)
-        
-        # Move up to the line with the tile sprites
-        line = map_file.readline()
-        while line.find("Tiles: ") < 0:
-            line = map_file.readline()
-            if line == "":
-                raise Exception ("Expected tile file")
-        
-        # Get the number of teams
-        line = line.lstrip("Tiles: ")
-        line = line.strip()
-        tile_filename = line
-        
-        # Move up to the line with the tile size
-        line = map_file.readline()
-        while line.find("Tile size: ") < 0:
-            line = map_file.readline()
-            if line == "":
-                raise Exception ("Expected tile size")
-        
-        # Get the number of teams
-        line = line.lstrip("Tile size: ")
-        line = line.strip()
-        size = line.split('x')
-        tile_w, tile_h = size
-        
-        # Convert to ints
-        tile_w = int(tile_w)
-        tile_h = int(tile_h)
-        
-        # Move up to the line with the map file
-        line = map_file.readline()
-        while line.find("Map: ") < 0:
-            line = map_file.readline()
-            if line == "":
-                raise Exception ("Expected map filename")
-        
-        # Get the map filename
-        line = line.lstrip("Map: ")
-        line = line.strip()
-        map_filename = line
+        # Read the level
+        level = rules.read_level(filename)
+        
+        # Start a game of it
+        self.game = gamestate.GameState.for_level(level)
         
         # Create the tile map
-        self.map = tiles.TileMap(tile_filename,
+        tile_w, tile_h = level.tile_size
+        self.map = tiles.TileMap(level.tile_file,
                                   tile_w,
                                   tile_h)
-        self.map.load_from_file(map_filename)
+        self.map.load_from_file(level.map_file)
         self.add(self.map)
         
         # Center the map on-screen
         self.map.rect.center = self.view_rect.center
         
-        # Move up to the unit definitions
-        while line.find("UNITS START") < 0:
-            line = map_file.readline()
-            if line == "":
-                raise Exception ("Expected unit definitions")
-        line = map_file.readline()
-        
         # Create the units
-        while line.find("UNITS END") < 0:
-            line = line.rstrip()
-            line = line.split(' ')
-            unit_name = line[0]
-            unit_team = int(line[1])
-            unit_x, unit_y = int(line[2]), int(line[3])
-            unit_angle = int(line[4])
-            
-            if not unit_name in unit.unit_types:
-                raise Exception("No unit of name {} found!".format(unit_name))
-            new_unit = unit.unit_types[unit_name](team = unit_team,
-                                                  tile_x = unit_x,
-                                                  tile_y = unit_y,
-                                                  activate = True,
-                                                  angle = unit_angle)
+        for placement in level.units:
+            new_unit = unit.unit_types[placement.name](
+                team = placement.team,
+                tile_x = placement.x,
+                tile_y = placement.y,
+                activate = True,
+                angle = placement.angle,
+                game = self.game)
             
             # Add the unit to the update group and set its display rect
             self.update_unit_rect(new_unit)
-            
-            line = map_file.readline()
-            if line == "":
-                raise Exception ("Expected end of unit definitions")
         
     def on_click(self, e):
         """
@@ -480,23 +405,15 @@ class GUI(LayeredUpdates):
         # Change the game state to show that there was an attack.
         self.change_mode(Modes.Select)
         
-        # Mark that the unit has attacked.
-        self.sel_unit.turn_state[1] = True
-        
         # Face the attackee
         self.sel_unit.face_vector((
             pos[0] - self.sel_unit.tile_x,
             pos[1] - self.sel_unit.tile_y))
         
-        # Get info about the attackee
-        atk_unit = unit.base_unit.BaseUnit.get_unit_at_pos(pos)
-        atk_tile = self.map.tile_data(pos)
-        
-        # Calculate the damage
-        damage = self.sel_unit.get_damage(atk_unit, atk_tile)
-        
-        # Deal damage
-        atk_unit.hurt(damage)
+        # Get the attackee, and make the attack in the game
+        atk_unit = self.game.unit_at(pos).view
+        self.game.attack(self.sel_unit.state, pos)
+        atk_unit.sync()
         
         # Do the attack effect.
         if self.sel_unit.hit_effect:
@@ -517,15 +434,9 @@ class GUI(LayeredUpdates):
             if atk_unit.die_sound:
                 SoundManager.play(atk_unit.die_sound)
 
-            # If the unit was destroyed, check if there are any others
-            # left on a team other than the selected unit
-            for u in unit.base_unit.BaseUnit.active_units:
-                if u.team != self.sel_unit.team:
-                    return
-                
-            # No other units, so game over!
-            self.win_team = self.sel_unit.team
-            self.mode = Modes.GameOver
+            # If that was the last unit of the other teams, it's game over!
+            if self.game.winner is not None:
+                self.mode = Modes.GameOver
     
     def sel_unit_move(self, pos):
         """
@@ -534,30 +445,12 @@ class GUI(LayeredUpdates):
         # Change the game state to show that there was a movement.
         self.change_mode(Modes.Moving)
         
-        # Mark that the unit has moved
-        self.sel_unit.turn_state[0] = True
-        
-        #the tile position the unit is at
-        from_tile_pos = (self.sel_unit.tile_x,
-                         self.sel_unit.tile_y)
-        
         # Play the unit's movement sound
         SoundManager.play(self.sel_unit.move_sound)
         
-        # These will be used in pathfinding
-        cost = lambda c: (
-            self.sel_unit.move_cost(self.map.tile_data(c)))
-        passable = lambda c: (
-            self.sel_unit.is_passable(self.map.tile_data(c), c))
-        
-        #set the path in the unit.
-        self.sel_unit.set_path(
-            tiles.find_path(
-                self.map,
-                from_tile_pos,
-                pos,
-                cost,
-                passable))
+        # Make the move in the game, and have the unit play it out along its
+        # path
+        self.sel_unit.set_path(self.game.move(self.sel_unit.state, pos))
                 
     def get_unit_at_screen_pos(self, pos):
         """
@@ -566,7 +459,15 @@ class GUI(LayeredUpdates):
         """
         # Get the unit's tile position.
         tile_pos = self.map.tile_coords(pos)
-        return unit.base_unit.BaseUnit.get_unit_at_pos(tile_pos)
+        return self.get_unit_at_tile_pos(tile_pos)
+        
+    def get_unit_at_tile_pos(self, tile_pos):
+        """
+        Gets the unit at a specified tile position ((x,y) tuple).
+        Returns None if no unit.
+        """
+        state = self.game.unit_at(tile_pos)
+        return state.view if state else None
         
     def update_unit_rect(self, unit):
         """
@@ -634,7 +535,7 @@ class GUI(LayeredUpdates):
         if self.mode == Modes.GameOver:
             # Determine the message
             win_text = "TEAM {} WINS!".format(
-                TEAM_NAME[self.win_team].upper())
+                TEAM_NAME[self.game.winner].upper())
             
             # Render the text
             win_msg = BIG_FONT.render(
@@ -775,13 +676,13 @@ class GUI(LayeredUpdates):
             #We can only know if there's a unit currently selected
             if self.sel_unit:
                 #Is the tile passable?
-                passable = self.sel_unit.is_passable(tile, coords)
+                passable = self.game.is_passable(self.sel_unit.state, coords)
                 self.draw_bar_text("Passable: {}".format(passable), line_num)
                 line_num += 1
                 
                 if passable:
                     #Movement cost
-                    cost = self.sel_unit.move_cost(tile)
+                    cost = rules.move_cost(self.sel_unit.spec, tile)
                     self.draw_bar_text("Movement Cost: {}".format(cost),
                                         line_num)
                     line_num += 1
@@ -791,7 +692,7 @@ class GUI(LayeredUpdates):
             line_num += 1
             
         #Get the hovered unit
-        hov_unit = unit.base_unit.BaseUnit.get_unit_at_pos(coords)
+        hov_unit = self.get_unit_at_tile_pos(coords)
         
         if hov_unit:
             #title for tile section
@@ -843,7 +744,11 @@ class GUI(LayeredUpdates):
                 #how much damage can we do?
                 FONT.set_bold(True)
                 
-                pot_dmg = self.sel_unit.get_damage(hov_unit, tile)
+                # Reuse the damage worked out for the attack targets
+                pot_dmg = self._attackable_tiles.get(coords)
+                if pot_dmg is None:
+                    pot_dmg = damagetable.lookup(self.sel_unit.state,
+                                                 hov_unit.state, tile)
                 self.draw_bar_text("Potential Damage: {}".format(pot_dmg),
                                     line_num)
                                     
@@ -0,0 +1,384 @@
+import pqueue, helper
+
+# The default width and height of a cluster, in tiles
+CLUSTER_SIZE = 16
+
+# Borders whose passable runs are at least this long get an entrance at each
+# end of the run, rather than just one in the middle
+LONG_ENTRANCE = 6
+
+class Hierarchy:
+    """
+    A hierarchical pathfinding (HPA*) layer over a TileMap for one movement
+    profile. The map is split into square clusters, and entrances are placed
+    where passable tiles meet across cluster borders. The cheapest way between
+    every two entrances of a cluster is found up front, so a long path can be
+    planned over the small graph of entrances and then only refined one
+    cluster at a time.
+
+    Only terrain is taken into account when building the hierarchy. Paths are
+    close to the cheapest, but aren't guaranteed to be the cheapest.
+
+    Hierarchies are normally made with TileMap.hierarchy, which keeps them up
+    to date as tiles change.
+
+    >>> import tiles
+    >>> from collections import namedtuple
+    >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+    >>> ground = Profile((1, 1, 1, 1.5, 1, 4, 2), (1, 0, 0, 1, 1, 1, 1))
+    >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/island.gif")
+    >>> h = Hierarchy(t, ground, 10)
+    >>> grids = t.profile_grids(ground)
+    >>> start, end = t.index_of((12, 4)), t.index_of((22, 25))
+    >>> path = h.find_path(start, end)
+    >>> [t.positions[i] for i in (path[0], path[-1])]
+    [(12, 4), (22, 25)]
+    >>> h.path_cost(path)
+    31.0
+    >>> flat = tiles.find_path_indexed(t, start, end,
+    ...                                grids.cost_list.__getitem__,
+    ...                                grids.passable_list.__getitem__)
+    >>> h.path_cost(flat)
+    31.0
+    """
+    def __init__(self, graph, profile, cluster_size = CLUSTER_SIZE):
+        """
+        graph: the TileMap to build the hierarchy over
+        profile: the movement profile whose terrain rules to use
+        cluster_size: the width and height of each cluster, in tiles
+        """
+        self._graph = graph
+        self._grids = graph.profile_grids(profile)
+        self._size = cluster_size
+
+        w, h = graph.get_map_size()
+        self._width, self._height = w, h
+        self._clusters_x = (w + cluster_size - 1) // cluster_size
+        self._clusters_y = (h + cluster_size - 1) // cluster_size
+
+        # The cheapest cost of leaving a tile, for the heuristic
+        costs = [c for c, p in zip(profile.costs, profile.passable) if p]
+        self._min_cost = min(costs) if costs else 1
+
+        # Entrance pairs (one tile on each side) by border, where a border is
+        # a (cluster, cluster) tuple with the top or left cluster first
+        self._transitions = {}
+
+        # Entrance tiles across borders from each entrance tile
+        self._inter = {}
+
+        # Entrance tiles of each cluster, and the cost of the cheapest path
+        # from each to the others within the cluster
+        self._nodes = {}
+        self._intra = {}
+
+        for border in self._borders():
+            self._build_border(border)
+        for c in range(self._clusters_x * self._clusters_y):
+            self._build_cluster(c)
+
+    def _cluster_of(self, i):
+        """
+        Returns the cluster which contains the given tile index.
+        """
+        x, y = i % self._width, i // self._width
+        return (y // self._size) * self._clusters_x + x // self._size
+
+    def _bounds(self, c):
+        """
+        Returns the tiles covered by a cluster as (x0, y0, x1, y1), where the
+        upper bounds are excluded.
+        """
+        cx, cy = c % self._clusters_x, c // self._clusters_x
+        x0, y0 = cx * self._size, cy * self._size
+        return (x0,
+                y0,
+                min(x0 + self._size, self._width),
+                min(y0 + self._size, self._height))
+
+    def _borders(self, c = None):
+        """
+        Returns the borders between every pair of neighbouring clusters, or
+        only those of cluster c if it is given.
+        """
+        cw, ch = self._clusters_x, self._clusters_y
+        clusters = range(cw * ch) if c is None else [c]
+
+        borders = set()
+        for a in clusters:
+            cx, cy = a % cw, a // cw
+            if cx < cw - 1: borders.add((a, a + 1))
+            if cy < ch - 1: borders.add((a, a + cw))
+            if c is not None:
+                if cx > 0: borders.add((a - 1, a))
+                if cy > 0: borders.add((a - cw, a))
+
+        return borders
+
+    def _build_border(self, border):
+        """
+        Finds the entrances along the given border, replacing the old ones.
+        """
+        passable = self._grids.passable_list
+        w = self._width
+        a, b = border
+        ax0, ay0, ax1, ay1 = self._bounds(a)
+
+        # Each pair of facing tiles along the border (with a single column of
+        # clusters, the cluster below is also the next one)
+        if b == a + 1 and b % self._clusters_x:
+            pairs = [(y * w + ax1 - 1, y * w + ax1) for y in range(ay0, ay1)]
+        else:
+            pairs = [((ay1 - 1) * w + x, ay1 * w + x) for x in range(ax0, ax1)]
+
+        # Forget the old entrances
+        for pair in self._transitions.get(border, []):
+            for u, v in (pair, pair[::-1]):
+                self._inter[u].discard(v)
+                if not self._inter[u]:
+                    del self._inter[u]
+
+        # Put entrances in each run of pairs which are passable on both sides
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and passable[pair[0]] and passable[pair[1]]:
+                run.append(pair)
+                continue
+
+            if len(run) >= LONG_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+
+        for u, v in transitions:
+            self._inter.setdefault(u, set()).add(v)
+            self._inter.setdefault(v, set()).add(u)
+        self._transitions[border] = transitions
+
+    def _build_cluster(self, c):
+        """
+        Finds the entrances of cluster c and the cheapest paths between them.
+        """
+        nodes = set()
+        for border in self._borders(c):
+            for pair in self._transitions.get(border, []):
+                nodes.update(i for i in pair if self._cluster_of(i) == c)
+
+        passable = self._grids.passable_list.__getitem__
+        intra = {}
+        for u in nodes:
+            costs, parents = self._search(u, c, passable)
+            intra[u] = {v: costs[v] for v in nodes if v != u and v in costs}
+
+        self._nodes[c] = nodes
+        self._intra[c] = intra
+
+    def tile_changed(self, i):
+        """
+        Updates the hierarchy after the terrain of the given tile index has
+        changed. Only the cluster containing the tile is rebuilt, along with
+        any neighbouring cluster whose entrances it affected.
+
+        >>> import tiles
+        >>> from collections import namedtuple
+        >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+        >>> ground = Profile((1,) * 7, (1, 0, 0, 1, 1, 1, 1))
+        >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_list([0] * 64, 8, 8)
+        >>> h = t.hierarchy(ground, 4)
+        >>> h.path_cost(h.find_path(t.index_of((0, 2)), t.index_of((7, 2))))
+        7
+        >>> for y in range(8):
+        ...     if y != 6: t.set_tile((4, y), 1)
+        >>> h.path_cost(h.find_path(t.index_of((0, 2)), t.index_of((7, 2))))
+        15
+        >>> rebuilt = Hierarchy(t, ground, 4)
+        >>> rebuilt._intra == h._intra and rebuilt._inter == h._inter
+        True
+        """
+        x, y = i % self._width, i // self._width
+        c = self._cluster_of(i)
+        x0, y0, x1, y1 = self._bounds(c)
+        cw = self._clusters_x
+
+        # Entrances only change if the tile is on the edge of its cluster
+        changed = set([c])
+        borders = []
+        if x == x0 and x > 0: borders.append((c - 1, c))
+        if x == x1 - 1 and x < self._width - 1: borders.append((c, c + 1))
+        if y == y0 and y > 0: borders.append((c - cw, c))
+        if y == y1 - 1 and y < self._height - 1: borders.append((c, c + cw))
+
+        for border in borders:
+            self._build_border(border)
+            changed.update(border)
+
+        for changed_c in changed:
+            self._build_cluster(changed_c)
+
+    def _search(self, start, c, passable, target = None, reverse = False):
+        """
+        Dijkstra's algorithm over the tiles of cluster c. Returns a tuple of
+        dicts holding the cheapest cost of every tile reached and the tile it
+        was reached from. If a target is given, the search stops there.
+
+        If reverse is True, the costs are of getting from each tile to the
+        start instead.
+        """
+        cost = self._grids.cost_list
+        w = self._width
+        x0, y0, x1, y1 = self._bounds(c)
+
+        todo = pqueue.PQueue()
+        todo.update(start, 0)
+        costs = {start: 0}
+        parents = {start: None}
+        visited = set()
+
+        while todo:
+            cur, g = todo.pop_smallest()
+            if cur == target:
+                break
+            visited.add(cur)
+
+            x, y = cur % w, cur // w
+            for nx, ny in ((x, y - 1), (x + 1, y), (x - 1, y), (x, y + 1)):
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+
+                n = ny * w + nx
+                if n in visited or not passable(n):
+                    continue
+
+                # The cost of a step is always that of the tile it leaves
+                new_cost = g + (cost[n] if reverse else cost[cur])
+                if n not in costs or new_cost < costs[n]:
+                    costs[n] = new_cost
+                    parents[n] = cur
+                    todo.update(n, new_cost)
+
+        return (costs, parents)
+
+    def path_cost(self, path):
+        """
+        Returns the cost of following the given path of tile indices.
+        """
+        cost = self._grids.cost_list
+        return sum(cost[i] for i in path[:-1])
+
+    def find_path(self, start, end, passable = None):
+        """
+        Returns a path between two tile indices as a list of tile indices, or
+        an empty list if there is none.
+
+        The passable function may rule out more tiles than the terrain does
+        (for instance, those with units on them). The entrances don't take
+        these tiles into account, so if they cut off the planned route, None is
+        returned and a flat search should be used instead.
+        """
+        # Whether other tiles than the terrain's impassable ones are ruled out
+        custom = passable is not None
+        if not custom:
+            passable = self._grids.passable_list.__getitem__
+
+        if start == end:
+            return [start]
+        if not passable(end):
+            return []
+
+        start_c = self._cluster_of(start)
+        end_c = self._cluster_of(end)
+        w = self._width
+
+        # Connect the start and end to the entrances of their clusters
+        from_start = self._search(start, start_c, passable)[0]
+        to_end = self._search(end, end_c, passable, reverse = True)[0]
+
+        def edges(u):
+            """
+            Returns the (node, cost) pairs which can be reached from node u.
+            """
+            c = self._cluster_of(u)
+            result = []
+            if u == start:
+                result += [(v, from_start[v]) for v in self._nodes[start_c]
+                           if v in from_start]
+            if u in self._intra[c]:
+                result += list(self._intra[c][u].items())
+                result += [(v, self._grids.cost_list[u])
+                           for v in self._inter.get(u, ())]
+            if c == end_c and u in to_end:
+                result.append((end, to_end[u]))
+            return result
+
+        end_pos = (end % w, end // w)
+        heuristic = lambda u: (
+            helper.manhattan_dist((u % w, u // w), end_pos) * self._min_cost)
+
+        # A* over the entrances
+        todo = pqueue.PQueue()
+        todo.update(start, heuristic(start))
+        g_costs = {start: 0}
+        parents = {start: None}
+        visited = set()
+
+        while todo:
+            cur, f = todo.pop_smallest()
+            if cur == end:
+                break
+            visited.add(cur)
+
+            for n, step in edges(cur):
+                if n in visited:
+                    continue
+                g = g_costs[cur] + step
+                if n not in g_costs or g < g_costs[n]:
+                    g_costs[n] = g
+                    parents[n] = cur
+                    todo.update(n, g + heuristic(n))
+
+        if end not in parents:
+            # The way may only be shut because of the extra impassable tiles
+            return None if custom else []
+
+        nodes = []
+        while end is not None:
+            nodes.append(end)
+            end = parents[end]
+        nodes.reverse()
+
+        return self._refine(nodes, passable)
+
+    def _refine(self, nodes, passable):
+        """
+        Turns a path over entrances into a path over tiles, or returns None if
+        part of it can't be followed.
+        """
+        path = [nodes[0]]
+        for a, b in zip(nodes, nodes[1:]):
+            c = self._cluster_of(a)
+            if c != self._cluster_of(b):
+                # Entrances across a border are next to each other
+                if not passable(b):
+                    return None
+                path.append(b)
+                continue
+
+            costs, parents = self._search(a, c, passable, b)
+            if b not in parents:
+                return None
+
+            part = []
+            while b != a:
+                part.append(b)
+                b = parents[b]
+            path += reversed(part)
+
+        return path
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
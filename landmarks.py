@@ -0,0 +1,174 @@
+import math
+from array import array
+import pqueue, helper
+
+# The default number of landmarks to pick per map and movement profile
+LANDMARK_COUNT = 6
+
+def distances(graph, source, cost, passable, reverse = False):
+    """
+    Returns an array holding the cost of the cheapest path from the source
+    tile index to every tile index (or infinity where there is none), given
+    lists of the cost of leaving each tile and whether each is passable.
+
+    If reverse is True, the costs are of the cheapest path from every tile to
+    the source instead. As a path may start on an impassable tile, these costs
+    are found for impassable tiles too.
+
+    >>> import tiles
+    >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/test-2.gif")
+    >>> cost = [1, 2] * 12 + [1]
+    >>> passable = [True] * 25
+    >>> distances(t, 0, cost, passable)[:5].tolist()
+    [0.0, 1.0, 3.0, 4.0, 6.0]
+    >>> distances(t, 0, cost, passable, reverse = True)[:5].tolist()
+    [0.0, 2.0, 3.0, 5.0, 6.0]
+    >>> passable[1] = False
+    >>> distances(t, 0, cost, passable)[:3].tolist()
+    [0.0, inf, 6.0]
+    >>> distances(t, 0, cost, passable, reverse = True)[:3].tolist()
+    [0.0, 2.0, 6.0]
+    """
+    adjacency = graph._adjacency
+    result = array('d', [math.inf]) * len(adjacency)
+    result[source] = 0
+
+    todo = pqueue.PQueue()
+    todo.update(source, 0)
+    visited = bytearray(len(adjacency))
+
+    while todo:
+        cur, c = todo.pop_smallest()
+        visited[cur] = 1
+
+        # Forward, a step costs the tile being left
+        step = cost[cur]
+        for n in adjacency[cur]:
+            if visited[n] or not (reverse or passable[n]):
+                continue
+
+            # Backward, the tile being left is the neighbour
+            new_cost = c + (cost[n] if reverse else step)
+            if new_cost < result[n]:
+                result[n] = new_cost
+
+                # Nothing can be reached through an impassable tile
+                if passable[n]:
+                    todo.update(n, new_cost)
+
+    return result
+
+class Landmarks:
+    """
+    An ALT (A*, landmarks and the triangle inequality) heuristic for one map
+    and movement profile. A few landmark tiles are picked far apart from each
+    other, and the exact cost of getting from each landmark to every tile and
+    from every tile to each landmark is stored. For any landmark L, the cost
+    of getting from a to b can't be less than cost(L, b) - cost(L, a) or
+    cost(a, L) - cost(b, L), which is usually a much closer estimate than the
+    Manhattan distance when walls and water force detours.
+
+    The landmarks are all picked in the largest area of the map which can be
+    travelled around, so paths elsewhere only get the Manhattan estimate.
+    The estimates only take terrain into account, so they still never
+    overestimate when other units are in the way. Landmarks are normally made
+    with TileMap.landmarks, which forgets them when the terrain changes.
+
+    >>> import tiles
+    >>> from collections import namedtuple
+    >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+    >>> ground = Profile((1, 1, 1, 1.5, 1, 4, 2), (1, 0, 0, 1, 1, 1, 1))
+    >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/island.gif")
+    >>> grids = t.profile_grids(ground)
+    >>> cost = grids.cost_list.__getitem__
+    >>> passable = grids.passable_list.__getitem__
+    >>> start, end = t.index_of((12, 4)), t.index_of((22, 25))
+    >>> alt = Landmarks(t, ground)
+    >>> path = tiles.find_path_indexed(t, start, end, cost, passable,
+    ...                                alt.heuristic)
+    >>> plain = tiles.find_path_indexed(t, start, end, cost, passable)
+    >>> sum(map(cost, path[:-1])) == sum(map(cost, plain[:-1]))
+    True
+    >>> alt.heuristic(start, end) <= sum(map(cost, plain[:-1]))
+    True
+    """
+    def __init__(self, graph, profile, count = LANDMARK_COUNT):
+        """
+        graph: the TileMap to pick landmarks on
+        profile: the movement profile whose terrain rules to use
+        count: the number of landmarks to pick
+        """
+        grids = graph.profile_grids(profile)
+        cost, passable = grids.cost_list, grids.passable_list
+        self._coords = graph._coords
+
+        # The cheapest cost of leaving a tile, for the Manhattan estimate
+        costs = [c for c, p in zip(profile.costs, profile.passable) if p]
+        self._min_cost = min(costs) if costs else 1
+
+        # Landmark tiles, and the tables of costs from and to each of them
+        self.landmarks = []
+        self._from = []
+        self._to = []
+
+        # How close each tile is to the landmarks so far. Before there are
+        # any, this is measured from a tile in the largest area which can be
+        # travelled around, which is where all the landmarks will be.
+        components = graph.components(profile)
+        tiles = [i for i, p in enumerate(passable) if p]
+        nearest = []
+        if tiles:
+            first = max(tiles, key = components.size)
+            nearest = distances(graph, first, cost, passable)
+
+        while len(self.landmarks) < count:
+            # Pick the reachable tile furthest from the landmarks so far
+            reachable = [(d, i) for i, d in enumerate(nearest)
+                         if d != math.inf]
+            if not reachable:
+                break
+            d, landmark = max(reachable)
+            if d == 0 and self.landmarks:
+                break
+
+            self.landmarks.append(landmark)
+            self._from.append(distances(graph, landmark, cost, passable))
+            self._to.append(
+                distances(graph, landmark, cost, passable, reverse = True))
+
+            nearest = array('d', map(min, nearest, self._from[-1]))
+
+        # The end of the last estimate, and the (table, offset, sign) terms of
+        # the landmarks which are useful for it
+        self._end = None
+        self._terms = []
+
+    def heuristic(self, a, b):
+        """
+        Returns a lower bound on the cost of getting from tile index a to tile
+        index b. This can be passed as the heuristic of find_path_indexed.
+        """
+        if b != self._end:
+            # Landmarks which can't reach b (or which b can't reach) don't say
+            # anything about the cost of getting there
+            self._end = b
+            self._terms = [(table, table[b], -1) for table in self._from
+                           if table[b] != math.inf]
+            self._terms += [(table, -table[b], 1) for table in self._to
+                            if table[b] != math.inf]
+
+        coords = self._coords
+        estimate = helper.manhattan_dist(coords[a], coords[b]) * self._min_cost
+        for table, offset, sign in self._terms:
+            # cost(L, b) - cost(L, a), or cost(a, L) - cost(b, L)
+            term = offset + sign * table[a]
+            if term > estimate:
+                estimate = term
+
+        return estimate
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
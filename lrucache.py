@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    A dictionary-like cache holding at most maxsize items. When it's full, the
+    least recently used item is dropped to make room. Counts how many lookups
+    found an item (hits) and how many didn't (misses), so that its size can be
+    tuned.
+
+    >>> c = LRUCache(2)
+    >>> c.put("a", 1)
+    >>> c.put("b", 2)
+    >>> c.get("a")
+    1
+    >>> c.put("c", 3)
+    >>> c.get("b") is None
+    True
+    >>> sorted(c.keys())
+    ['a', 'c']
+    >>> (c.hits, c.misses)
+    (1, 1)
+    >>> c.maxsize = 1
+    >>> len(c)
+    1
+    >>> c.get("c")
+    3
+    >>> c.pop("c"), c.pop("c")
+    (3, None)
+    """
+    def __init__(self, maxsize = 128):
+        """
+        maxsize: the most items the cache will hold
+        """
+        self._items = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    @property
+    def maxsize(self):
+        """
+        The most items the cache will hold. Lowering this drops the least
+        recently used items which no longer fit.
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        self._maxsize = maxsize
+        self._trim()
+
+    def _trim(self):
+        """
+        Drops the least recently used items until the cache fits its size.
+        """
+        while len(self._items) > self._maxsize:
+            self._items.popitem(last = False)
+
+    def keys(self):
+        """
+        Returns the keys in the cache, from least to most recently used.
+        """
+        return self._items.keys()
+
+    def get(self, key, default = None):
+        """
+        Returns the item stored under key and marks it as the most recently
+        used, or returns default if there is no such item.
+        """
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores an item under key as the most recently used.
+        """
+        self._items[key] = value
+        self._items.move_to_end(key)
+        self._trim()
+
+    def pop(self, key, default = None):
+        """
+        Removes the item stored under key and returns it, or returns default
+        if there is no such item. This doesn't count as a lookup.
+        """
+        return self._items.pop(key, default)
+
+    def clear(self):
+        """
+        Removes every item and resets the hit and miss counts.
+        """
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
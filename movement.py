@@ -0,0 +1,149 @@
+import tiles, helper, hpa, lrucache, rules
+
+# When asked for, paths at least this long (in Manhattan distance) are planned
+# with the map's hpa.Hierarchy for the unit's profile rather than searched for
+# directly
+HIERARCHY_DISTANCE = 4 * hpa.CLUSTER_SIZE
+
+# Results of find_unit_path. Keys include the map's version and the game's
+# occupancy version, so results go out of date by themselves when a tile
+# changes or a unit activates, deactivates or moves. Its hits and misses can
+# be used to tune its maxsize.
+path_cache = lrucache.LRUCache(256)
+
+def profile_for(unit):
+    """
+    Returns the rules.MovementProfile of the given unit, compiled from its
+    spec.
+
+    >>> from unit.tank import Tank
+    >>> from unit.artillery import Artillery
+    >>> from unit.anti_air import AntiAir
+    >>> profile_for(Tank(team = 0)).passable
+    (True, False, False, True, True, False, False)
+    >>> profile_for(Artillery(team = 0)).costs
+    (1.5, 1, 1, 1.5, 1, 3, 1)
+    >>> profile_for(Artillery(team = 0)) is profile_for(AntiAir(team = 1))
+    True
+    """
+    return rules.movement_profile(unit.spec)
+
+def path_functions(unit, tile_map):
+    """
+    Returns a tuple of (cost, passable) functions for the given unit (a
+    gamestate.UnitState) which take tile indices, for use with the indexed
+    pathfinding functions in tiles.
+
+    Terrain rules are read from the map's compiled grids for the unit's
+    profile, so only the check for blocking units is done per tile, by the
+    unit's game.
+    """
+    grids = tile_map.profile_grids(profile_for(unit))
+    terrain_passable = grids.passable_list
+    positions = tile_map.positions
+    is_blocked = unit.game.is_blocked
+
+    cost = grids.cost_list.__getitem__
+    passable = lambda i: (
+        terrain_passable[i] and not is_blocked(unit, positions[i]))
+
+    return (cost, passable)
+
+def _cache_key(kind, unit, tile_map, target):
+    """
+    Returns the path_cache key for a search of the given kind by the unit
+    towards target (a goal or a budget).
+
+    Only the unit's movement profile and team affect the search, so equal
+    units on the same tile share results.
+    """
+    return (kind,
+            tile_map,
+            tile_map.version,
+            unit.game,
+            unit.game.occupancy_version,
+            profile_for(unit),
+            unit.team,
+            unit.pos,
+            target)
+
+def find_unit_path(unit, tile_map, goal, hierarchical = False):
+    """
+    Returns the cheapest path the unit (a gamestate.UnitState) could take on
+    the given map from its current position to the given tile coordinates,
+    or an empty list if there is none. Units in the unit's game block it as
+    they do its moves there.
+
+    If hierarchical is True, paths of at least HIERARCHY_DISTANCE are planned
+    with the map's hpa.Hierarchy instead, which is much faster on large maps.
+    Such a path isn't always the cheapest, as it has to pass through the
+    hierarchy's entrances. It costs a few percent more on average (the "cost"
+    column of benchmarks.hpa_bench), and more than that for some paths.
+
+    Results are kept in path_cache until something on the board changes. A
+    new list is returned every time, as units use up their paths as they
+    follow them.
+
+    >>> from unit.jeep import Jeep
+    >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/test-2.gif")
+    >>> jeep = Jeep(team = 0, tile_x = 2, tile_y = 2, activate = True)
+    >>> path = find_unit_path(jeep.state, t, (4, 2))
+    >>> path[0], path[-1]
+    ((2, 2), (4, 2))
+    >>> hits = path_cache.hits
+    >>> find_unit_path(jeep.state, t, (4, 2)) == path
+    True
+    >>> path_cache.hits == hits + 1
+    True
+    >>> jeep.set_tile_pos(2, 3)
+    >>> find_unit_path(jeep.state, t, (4, 2))[0]
+    (2, 3)
+    >>> jeep.deactivate()
+    """
+    key = _cache_key("hierarchical path" if hierarchical else "path",
+                     unit, tile_map, goal)
+    path = path_cache.get(key)
+    if path is None:
+        path = _find_unit_path(unit, tile_map, goal, hierarchical)
+        path_cache.put(key, tuple(path))
+
+    return list(path)
+
+def _find_unit_path(unit, tile_map, goal, hierarchical):
+    """
+    The search for find_unit_path, without the cache.
+    """
+    start = tile_map.index_of(unit.pos)
+    end = tile_map.index_of(goal)
+    if start < 0 or end < 0:
+        return []
+
+    profile = profile_for(unit)
+    cost, passable = path_functions(unit, tile_map)
+
+    path = None
+    if (hierarchical and
+        helper.manhattan_dist(unit.pos, goal) >= HIERARCHY_DISTANCE and
+        tile_map.can_reach(profile, start, end)):
+        path = tile_map.hierarchy(profile).find_path(start, end, passable)
+
+    # Other units can get in the way of the hierarchy's plan
+    if path is None:
+        # Uniform costs use the default heuristic, so that straight paths
+        # skip the search
+        heuristic = None
+        costs = set(c for c, p in zip(profile.costs, profile.passable) if p)
+        if len(costs) > 1:
+            heuristic = tile_map.landmarks(profile).heuristic
+
+        path = tiles.find_path_indexed(tile_map,
+                                       start,
+                                       end,
+                                       cost,
+                                       passable,
+                                       heuristic,
+                                       profile)
+
+    positions = tile_map.positions
+    return [positions[i] for i in path]
@@ -1,3 +1,10 @@
+import heapq
+from functools import cmp_to_key
+
+# Placeholder key for heap entries which have been superseded by a later
+# update. These are skipped when they reach the top of the heap.
+_REMOVED = object()
+
 def heapsort(l):
     """
     Sort a list using the heap (assuming there are no repeated values).
@@ -9,33 +16,15 @@ def heapsort(l):
     for (i, x) in enumerate(l): q.update(i, x)
     return [ q.pop_smallest()[1] for x in l ]
 
-def _parent(i):
-    """
-    Returns the parent node of the given node.
-    """
-    return (i - 1) // 2
-    
-def _lchild(i):
-    """
-    Returns the left child node of the given node.
-    """
-    return 2 * i + 1
-    
-def _rchild(i):
-    """
-    Returns the right child node of the given node.
-    """
-    return 2 * i + 2
-    
-def _children(i):
-    """
-    Returns the children of the given node as a tuple (left then right).
-    """
-    return (_lchild(i), _rchild(i))
-
 class PQueue:
     """
-    Priority queue implemented with dictionaries. Stores a set of keys and associated priorities.
+    Priority queue implemented on top of heapq. Stores a set of keys and
+    associated priorities.
+    
+    Lowering a key's priority pushes a new heap entry and marks the old one as
+    removed, so no entry ever has to be found and sifted in place. Ties between
+    equal priorities are broken by a sort key which is computed once when a key
+    is pushed, so the heap only ever compares plain tuples.
     
     >>> q = PQueue()
     >>> q.is_empty()
@@ -88,101 +77,81 @@ class PQueue:
     >>> q.pop_smallest()[0][0]
     'A'
     
+    The same ordering using a precomputed tie key instead of a comparison:
+    >>> q = PQueue(tie_key = lambda x: x[1])
+    >>> for key, priority in [(("A", 6), 5), (("B", 1), 5), (("C", 10), 1)]:
+    ...     _ = q.update(key, priority)
+    >>> [q.pop_smallest()[0][0] for i in range(len(q))]
+    ['C', 'B', 'A']
     """
-    def __init__(self):
+    def __init__(self, tie_key = None):
+        """
+        tie_key: optional function which maps a key to a sort key used to
+        order keys of equal priority (lowest first)
+        """
         self._heap = []
-        self._keyindex = {}
-        self.tie_breaker = None
+        self._entries = {}
+        self._count = 0
+        self._tie_breaker = None
+        self.tie_key = tie_key
         
     def __len__(self):
-        return len(self._heap)
+        return len(self._entries)
         
     def __contains__(self, key):
-        return key in self._keyindex 
-        
-    def _key(self, i):
-        """
-        Returns the key value of the given node.
-        """
-        return self._heap[i][0]
+        return key in self._entries
         
-    def _priority(self, i):
-        """
-        Returns the priority of the given node.
-        """
-        return self._heap[i][1]
-    
-    def _swap(self, i, j):
+    @property
+    def tie_breaker(self):
         """
-        Swap the positions of two nodes and update the key index.
-        """
-        (self._heap[i], self._heap[j]) = (self._heap[j], self._heap[i])
-        (self._keyindex[self._key(i)], self._keyindex[self._key(j)]) = (self._keyindex[self._key(j)], self._keyindex[self._key(i)])
+        Optional comparison function which takes two keys of equal priority
+        and returns True if the first should be popped before the second.
         
-    def _heapify_down(self, i):
-        """
-        Solves heap violations starting at the given node, moving down the heap.
+        This is slower than tie_key, as it has to be called on every
+        comparison. Prefer tie_key where the ordering can be expressed as a
+        sort key.
         """
+        return self._tie_breaker
         
-        children = [ c for c in _children(i) if c < len(self._heap) ]
-        
-        # This is a leaf, so stop
-        if not children: return
-        
-        # Get the minimum child
-        min_child = min(children, key=self._priority)
+    @tie_breaker.setter
+    def tie_breaker(self, tie_breaker):
+        self._tie_breaker = tie_breaker
         
-        # If there are two children with the same priority, we need to break the tie
-        if self.tie_breaker and len(children) == 2:
-            c0 = children[0]
-            c1 = children[1]
-            if self._priority(c0) == self._priority(c1):
-                min_child = c0 if self.tie_breaker(self._key(c0), self._key(c1)) else c1
-        
-        # Sort, if necessary
-        a = self._priority(i)
-        b = self._priority(min_child)
-        if a > b or (self.tie_breaker and a == b and not self.tie_breaker(self._key(i), self._key(min_child))):
-            # Swap with the minimum child and continue heapifying
-            self._swap(i, min_child)
-            self._heapify_down(min_child)
-            
-    def _heapify_up(self, i):
+        if tie_breaker:
+            # Wrap the comparison so it can be used as a sort key
+            cmp = lambda a, b: -1 if tie_breaker(a, b) else 1
+            self.tie_key = cmp_to_key(cmp)
+        else:
+            self.tie_key = None
+    
+    def _clean_top(self):
         """
-        Solves heap violations starting at the given node, moving up the heap.
+        Discards removed entries from the top of the heap.
         """
-        # This is the top of the heap, so stop.
-        if i == 0: return
-        
-        parent = _parent(i)
-        a = self._priority(i)
-        b = self._priority(parent)
-        if a < b or (self.tie_breaker and a == b and self.tie_breaker(self._key(i), self._key(parent))):
-            self._swap(i, parent)
-            self._heapify_up(parent)
+        heap = self._heap
+        while heap and heap[0][-1] is _REMOVED:
+            heapq.heappop(heap)
             
     def peek_smallest(self):
         """
         Returns a tuple containing the key with the smallest priority and its associated priority.
         """
-        return self._heap[0]
+        self._clean_top()
+        entry = self._heap[0]
+        return (entry[-1], entry[0])
         
     def pop_smallest(self):
         """
         Removes the key with the smallest priority and returns a tuple containing the key and its associated priority
         """
+        heap = self._heap
+        while heap:
+            priority, tie, count, key = heapq.heappop(heap)
+            if key is not _REMOVED:
+                del self._entries[key]
+                return (key, priority)
         
-        # Swap the last node to the front
-        self._swap(0, len(self._heap) - 1)
-        
-        # Remove the smallest from the list
-        (key, priority) = self._heap.pop()
-        del self._keyindex[key]
-        
-        # Fix the heap
-        self._heapify_down(0)
-        
-        return (key, priority)
+        raise IndexError("pop from an empty priority queue")
         
     def update(self, key, priority):
         """
@@ -193,24 +162,26 @@ class PQueue:
         
         Return True if a change was made, else False.
         """
+        entries = self._entries
+        old = entries.get(key)
         
-        if key in self._keyindex:
-            # Find key index in heap
-            i = self._keyindex[key]
-            
+        if old is not None:
             # Make sure this lowers its priority
-            if priority > self._priority(i):
+            if priority > old[0]:
                 return False
             
-            # Fix the heap
-            self._heap[i] = (key, priority)
-            self._heapify_up(i)
-            return True
+            # Invalidate the old entry, reusing its tie key
+            old[-1] = _REMOVED
+            tie = old[1]
         else:
-            self._heap.append((key, priority))
-            self._keyindex[key] = len(self._heap) - 1
-            self._heapify_up(len(self._heap) - 1)
-            return True
+            tie = self.tie_key(key) if self.tie_key else 0
+        
+        # Entries are compared by priority, then tie key, then insertion order
+        self._count += 1
+        entry = [priority, tie, self._count, key]
+        entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        return True
         
     def is_empty(self):
         """
@@ -0,0 +1,538 @@
+import pqueue, helper
+
+# Bucket queue resolutions by movement profile (see profile_resolution)
+_resolutions = {}
+
+# Open costs by movement profile (see profile_open_cost)
+_open_costs = {}
+
+class Grid:
+    """
+    The graph of a map of tiles, laid out the same way as a tiles.TileMap's:
+    tiles are numbered in row order, and each has a list of the indices of the
+    tiles next to it. The search functions here take either one as their graph,
+    so this lets them be used without a TileMap, and so without pygame.
+    
+    >>> g = Grid(5, 5)
+    >>> g._adjacency[6], g._coords[6]
+    ((1, 7, 5, 11), (1, 1))
+    >>> g._tile_index((1, 1)), g._tile_index((5, 1))
+    (6, -1)
+    """
+    def __init__(self, width, height):
+        """
+        width, height: the size of the map in tiles
+        """
+        self._map_width = width
+        self._map_height = height
+        self._coords = [(i % width, i // width) for i in range(width * height)]
+        
+        # The neighbours of each tile, in the same order as TileMap's
+        self._adjacency = []
+        for i, (x, y) in enumerate(self._coords):
+            n = []
+            if y > 0: n.append(i - width)
+            if x < width - 1: n.append(i + 1)
+            if x > 0: n.append(i - 1)
+            if y < height - 1: n.append(i + width)
+            self._adjacency.append(tuple(n))
+            
+    def _tile_index(self, coords):
+        """
+        Returns the index of the tile at the given coordinates, or -1 if there
+        is no such tile.
+        """
+        x, y = coords
+        if not (0 <= x < self._map_width and 0 <= y < self._map_height):
+            return -1
+        return int(y) * self._map_width + int(x)
+    
+def tie_key(tile, start, end):
+    """
+    Returns the sort key which orders tiles the same way as tiles.better_tile,
+    with the best tile lowest: the tile's squared distance from the line
+    between start and end (to 3 decimal places), then its Y, then its X.
+    Sorting by this is much faster than comparing with better_tile, as the key
+    only has to be worked out once per tile.
+    
+    >>> tie_key((1, 4), (0, 3), (3, 3)) < tie_key((1, 1), (0, 3), (3, 3))
+    True
+    >>> tie_key((0, 1), (0, 0), (3, 3))
+    (0.5, 1, 0)
+    """
+    return (round(helper.squared_segment_dist(tile, start, end), 3),
+            tile[1],
+            tile[0])
+    
+class SearchTree:
+    """
+    The shortest path tree left behind by a search from one start tile, as
+    returned by reachable_indexed. Stores the cost of getting to every tile
+    which was reached, and every neighbour through which each tile can be
+    reached at that cost, so that paths can be rebuilt without searching again.
+    
+    All tiles are given as tile indices.
+    
+    >>> import tiles
+    >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/test-2.gif")
+    >>> reachable, tree = reachable_indexed(t, 0, 8, return_tree = True)
+    >>> tree.cost_to(24)
+    8
+    >>> tree.cost_to(0)
+    0
+    >>> tree.path_to(24)
+    [0, 1, 6, 7, 12, 13, 18, 19, 24]
+    >>> tree.path(t.positions[24]) == tiles.find_path(t, (0, 0), (4, 4))
+    True
+    """
+    def __init__(self, graph, start, costs, parents):
+        """
+        graph: the map which was searched
+        start: the index of the start tile
+        costs: a list holding the cost of reaching each tile index, or None
+        parents: a list holding, for each tile index, a list of the
+                 neighbours it can be reached from at its cost (or None)
+        """
+        self._graph = graph
+        self.start = start
+        self.costs = costs
+        self.parents = parents
+        
+    def cost_to(self, end):
+        """
+        Returns the cost of the cheapest path to the given tile index, or None
+        if it wasn't reached.
+        """
+        return self.costs[end]
+        
+    def path_to(self, end):
+        """
+        Returns the cheapest path from the start to the given tile index as a
+        list of tile indices, or an empty list if it wasn't reached.
+        
+        Where there is more than one cheapest path, this is the one find_path
+        gives (with the default heuristic). A* reaches each tile first from
+        whichever of its cheapest neighbours it takes out of its queue first,
+        which is the one with the lowest cost plus distance to the end, with
+        ties going to the tile closest to the straight line between the start
+        and end. Only when that still leaves several neighbours is the order
+        A* would take them out in worked out (see _queue_order).
+        
+        Matches find_path on random maps:
+        >>> import random, tiles
+        >>> rand = random.Random(6)
+        >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/island.gif")
+        >>> n = len(t.positions)
+        >>> matches = []
+        >>> for trial in range(20):
+        ...     costs = [rand.choice([1, 1, 1.5, 2]) for i in range(n)]
+        ...     blocked = set(rand.sample(range(n), n // 5))
+        ...     cost = lambda c: costs[t.index_of(c)]
+        ...     passable = lambda c: t.index_of(c) not in blocked
+        ...     start = rand.choice(t.positions)
+        ...     reachable, tree = tiles.reachable_tiles(t, start, 12, cost,
+        ...                                             passable, True)
+        ...     matches += [tree.path(end) == tiles.find_path(t, start, end,
+        ...                                                   cost, passable)
+        ...                 for end in reachable]
+        >>> len(matches) > 1000 and all(matches)
+        True
+        """
+        if self.costs[end] is None:
+            return []
+            
+        coords = self._graph._coords
+        costs = self.costs
+        start, goal = self.start, end
+        end_pos = coords[goal]
+        
+        # A*'s f cost of each tile on the way to this end
+        f_cost = lambda i: costs[i] + helper.manhattan_dist(coords[i], end_pos)
+        
+        # the order A* takes out tiles of equal f cost, by f cost
+        orders = {}
+        
+        # build the path backward
+        path = []
+        while end != start:
+            path.append(end)
+            options = self.parents[end]
+            
+            # the start is always taken out of the queue first
+            if start in options:
+                break
+            
+            # pick the way A* would have come here
+            if len(options) > 1:
+                best = min(f_cost(p) for p in options)
+                options = [p for p in options if f_cost(p) == best]
+            if len(options) > 1:
+                if best not in orders:
+                    orders[best] = self._queue_order(goal, f_cost, best)
+                end = min(options, key = orders[best].get)
+            else:
+                end = options[0]
+        path.append(start)
+        path.reverse()
+        
+        return path
+        
+    def _queue_order(self, goal, f_cost, f):
+        """
+        Returns a dictionary giving, for every tile with the given f cost, its
+        place in the order that A* from the start to goal would take them out
+        of its queue.
+        
+        A* gives a tile its final cost, and so the f cost it's queued with,
+        when the first of its cheapest neighbours is taken out. Tiles of lower
+        f cost are all taken out first, so the tiles of this f cost which are
+        queued to start with are those with a cheapest neighbour outside of
+        them. The rest are queued as their neighbours with the same f cost are
+        taken out, and the queue breaks ties in the same way as A*'s.
+        """
+        coords = self._graph._coords
+        adjacency = self._graph._adjacency
+        costs, parents, start = self.costs, self.parents, self.start
+        start_pos, end_pos = coords[start], coords[goal]
+        
+        level = set(i for i, c in enumerate(costs)
+                    if c is not None and i != start and f_cost(i) == f)
+        
+        todo = pqueue.PQueue(
+            tie_key = lambda i: tie_key(coords[i], start_pos, end_pos))
+        for i in level:
+            if any(p == start or p not in level for p in parents[i]):
+                todo.update(i, 0)
+        
+        order = {}
+        while todo:
+            cur, c = todo.pop_smallest()
+            order[cur] = len(order)
+            
+            for n in adjacency[cur]:
+                if n in level and n not in order and cur in parents[n]:
+                    todo.update(n, 0)
+        
+        return order
+        
+    def path(self, end_pos):
+        """
+        Returns the same path as path_to, taking and returning (x, y) tile
+        coordinates.
+        """
+        end = self._graph._tile_index(end_pos)
+        if end < 0:
+            return []
+            
+        coords = self._graph._coords
+        return [coords[i] for i in self.path_to(end)]
+    
+def cost_resolution(costs, limit = 8):
+    """
+    Returns the smallest whole number which turns every one of the given costs
+    into a whole number when multiplied by it, or None if there is none up to
+    limit. This is the resolution to use for reachable_indexed's bucket queue.
+    
+    >>> cost_resolution([1, 2, 3])
+    1
+    >>> cost_resolution([1, 1.5, 3])
+    2
+    >>> cost_resolution([1, 0.1]) is None
+    True
+    """
+    for resolution in range(1, limit + 1):
+        if all(abs(c * resolution - round(c * resolution)) < 1e-9
+               for c in costs):
+            return resolution
+            
+    return None
+    
+def profile_resolution(profile):
+    """
+    Returns the resolution to give reachable_indexed so that it can use its
+    bucket queue with the given movement profile's costs (see
+    rules.MovementProfile), or None if the costs need the heap.
+    
+    >>> import rules
+    >>> profile_resolution(rules.movement_profile(rules.UNIT_SPECS["Jeep"]))
+    1
+    >>> profile_resolution(
+    ...     rules.movement_profile(rules.UNIT_SPECS["Artillery"]))
+    2
+    """
+    if profile not in _resolutions:
+        passable_costs = [c for c, p in zip(profile.costs, profile.passable)
+                          if p]
+        _resolutions[profile] = cost_resolution(passable_costs)
+        
+    return _resolutions[profile]
+    
+def profile_open_cost(profile):
+    """
+    Returns the cost of leaving a tile if units with the given movement profile
+    can move over every tile at that same cost (as air units can), or None
+    otherwise. Such units can reach a whole diamond of tiles unless another
+    unit is in the way, which reachable_indexed can list without a search.
+    
+    >>> import rules
+    >>> profile_open_cost(rules.movement_profile(rules.UNIT_SPECS["Fighter"]))
+    1
+    >>> profile_open_cost(
+    ...     rules.movement_profile(rules.UNIT_SPECS["Tank"])) is None
+    True
+    """
+    if profile not in _open_costs:
+        step = None
+        if all(profile.passable) and len(set(profile.costs)) == 1:
+            step = profile.costs[0]
+        _open_costs[profile] = step
+        
+    return _open_costs[profile]
+    
+def reachable_indexed(graph,
+                        start,
+                        max_cost,
+                        cost = lambda i: 1,
+                        passable = lambda i: True,
+                        return_tree = False,
+                        resolution = None,
+                        open_cost = None):
+    """
+    Returns a set of tile indices which can be reached with a total cost of
+    max_cost. This is the same as tiles.reachable_tiles, except that every
+    node (including those passed to the cost and passable functions) is a flat
+    index into the map's tile list rather than an (x, y) tuple. The graph is a
+    tiles.TileMap or a Grid.
+    
+    If a resolution is given, every cost is expected to be a multiple of
+    1 / resolution (see cost_resolution). The search then keeps tiles in
+    buckets by their cost in those units (Dial's algorithm) instead of in a
+    heap. If a cost turns out not to be such a multiple, the heap is used
+    instead.
+    
+    >>> t = Grid(5, 5)
+    >>> sorted(reachable_indexed(t, 0, 1))
+    [0, 1, 5]
+    
+    Both queues give the same result:
+    >>> cost = lambda i: 1.5 if i % 3 else 1
+    >>> heap = reachable_indexed(t, 12, 5, cost, return_tree = True)
+    >>> buckets = reachable_indexed(t, 12, 5, cost, return_tree = True,
+    ...                             resolution = 2)
+    >>> heap[0] == buckets[0] and heap[1].costs == buckets[1].costs
+    True
+    >>> reachable_indexed(t, 12, 5, cost, resolution = 1) == heap[0]
+    True
+    
+    If open_cost is given, the caller knows that every tile within max_cost of
+    the start can be entered and costs open_cost to leave (as for an air unit
+    with no enemy aircraft nearby). The reachable tiles are then the diamond
+    around the start, clipped to the map, and are listed without a search
+    (and without calling cost or passable):
+    >>> diamond = reachable_indexed(t, 12, 2, return_tree = True,
+    ...                             open_cost = 1)
+    >>> search = reachable_indexed(t, 12, 2, return_tree = True)
+    >>> diamond[0] == search[0] and diamond[1].costs == search[1].costs
+    True
+    >>> diamond[1].path_to(4) == search[1].path_to(4)
+    True
+    """
+    result = None
+    if open_cost:
+        result = _reachable_diamond(graph, start, max_cost, open_cost)
+    elif resolution:
+        result = _reachable_buckets(
+            graph, start, max_cost, cost, passable, resolution)
+        
+    # Either no resolution was given or the costs didn't fit it
+    if result is None:
+        result = _reachable_heap(graph, start, max_cost, cost, passable)
+    
+    reachable, costs, parents = result
+    
+    if return_tree:
+        return (reachable, SearchTree(graph, start, costs, parents))
+    
+    return reachable
+    
+def _reachable_diamond(graph, start, max_cost, step):
+    """
+    reachable_indexed for when every tile in reach can be entered and costs
+    step to leave. A tile's cost is then step times its Manhattan distance from
+    the start, and it can be reached at that cost from each of its neighbours
+    which is one step closer. Returns the same as _reachable_heap.
+    """
+    w, h = graph._map_width, graph._map_height
+    sx, sy = graph._coords[start]
+    radius = int(max_cost // step)
+    
+    costs = [None] * len(graph._adjacency)
+    parents = [None] * len(graph._adjacency)
+    costs[start] = 0
+    reachable = set()
+    reachable.add(start)
+    
+    for y in range(max(sy - radius, 0), min(sy + radius, h - 1) + 1):
+        dy = y - sy
+        span = radius - abs(dy)
+        for x in range(max(sx - span, 0), min(sx + span, w - 1) + 1):
+            dx = x - sx
+            if not (dx or dy):
+                continue
+            
+            i = y * w + x
+            reachable.add(i)
+            costs[i] = (abs(dx) + abs(dy)) * step
+            
+            # the neighbours towards the start along each axis
+            options = []
+            if dx:
+                options.append(i - 1 if dx > 0 else i + 1)
+            if dy:
+                options.append(i - w if dy > 0 else i + w)
+            parents[i] = options
+    
+    return (reachable, costs, parents)
+    
+def _reachable_heap(graph, start, max_cost, cost, passable):
+    """
+    Dijkstra's algorithm for reachable_indexed using a binary heap. Returns a
+    tuple of the reachable set, and the cost and parent lists for a SearchTree.
+    """
+    adjacency = graph._adjacency
+    
+    # tiles to check
+    todo = pqueue.PQueue()
+    todo.update(start, 0)
+    
+    # tiles we've been to
+    visited = bytearray(len(adjacency))
+    
+    # cheapest known cost of each tile, and the tiles it can be reached from
+    # at that cost
+    costs = [None] * len(adjacency)
+    costs[start] = 0
+    parents = [None] * len(adjacency)
+    
+    # tiles which we can get to within max_cost
+    reachable = set()
+    reachable.add(start)
+    
+    while todo:
+        cur, c = todo.pop_smallest()
+        visited[cur] = 1
+        
+        # the cost of leaving this tile is the same for every neighbour
+        new_cost = c + cost(cur)
+        
+        # nothing past here is cheap enough to reach, so don't bother checking
+        if new_cost > max_cost:
+            continue
+        
+        # check neighbours
+        for n in adjacency[cur]:
+            # skip it if we've already checked it, or if it isn't passable
+            if visited[n] or not passable(n):
+                continue
+            
+            old_cost = costs[n]
+            if old_cost is None or new_cost < old_cost:
+                # this is the cheapest way here so far
+                reachable.add(n)
+                costs[n] = new_cost
+                parents[n] = [cur]
+                todo.update(n, new_cost)
+            elif new_cost == old_cost:
+                # this is just as cheap, so remember it for tie-breaking
+                parents[n].append(cur)
+    
+    return (reachable, costs, parents)
+    
+def _reachable_buckets(graph, start, max_cost, cost, passable, resolution):
+    """
+    Dial's algorithm for reachable_indexed. Costs are scaled by resolution into
+    whole numbers, and tiles are kept in one bucket per total cost. Only
+    buckets which have had tiles added to them exist, and the search ends once
+    they are all empty, so a large max_cost costs nothing extra.
+    
+    Returns the same as _reachable_heap, or None if a cost isn't a multiple of
+    1 / resolution.
+    """
+    adjacency = graph._adjacency
+    limit = int(max_cost * resolution + 1e-9)
+    
+    # tiles to check, by scaled cost, and how many are left in total
+    buckets = {0: [start]}
+    pending = 1
+    
+    # tiles we've been to
+    visited = bytearray(len(adjacency))
+    
+    # cheapest known scaled cost of each tile, and the tiles it can be reached
+    # from at that cost
+    costs = [None] * len(adjacency)
+    costs[start] = 0
+    parents = [None] * len(adjacency)
+    
+    # tiles which we can get to within max_cost
+    reachable = set()
+    reachable.add(start)
+    
+    c = -1
+    while pending:
+        c += 1
+        bucket = buckets.pop(c, None)
+        if not bucket:
+            continue
+        pending -= len(bucket)
+        
+        for cur in bucket:
+            # skip tiles which were since found to be cheaper
+            if visited[cur]:
+                continue
+            visited[cur] = 1
+            
+            # the cost of leaving this tile, in whole units
+            step = cost(cur) * resolution
+            int_step = round(step)
+            if abs(step - int_step) > 1e-9:
+                return None
+            new_cost = c + int_step
+            
+            # nothing past here is cheap enough to reach
+            if new_cost > limit:
+                continue
+            
+            # check neighbours
+            for n in adjacency[cur]:
+                # skip it if we've already checked it, or if it isn't passable
+                if visited[n] or not passable(n):
+                    continue
+                
+                old_cost = costs[n]
+                if old_cost is None or new_cost < old_cost:
+                    # this is the cheapest way here so far
+                    reachable.add(n)
+                    costs[n] = new_cost
+                    parents[n] = [cur]
+                    pending += 1
+                    if new_cost in buckets:
+                        buckets[new_cost].append(n)
+                    else:
+                        buckets[new_cost] = [n]
+                elif new_cost == old_cost:
+                    # this is just as cheap, so remember it for tie-breaking
+                    parents[n].append(cur)
+    
+    # convert the costs back to movement units
+    if resolution != 1:
+        for i in reachable:
+            costs[i] /= resolution
+    
+    return (reachable, costs, parents)
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
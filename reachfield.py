@@ -0,0 +1,153 @@
+import pqueue, reach
+
+class ReachField:
+    """
+    The result of a reachable_indexed search from one start tile, which can be
+    repaired when some tiles change whether they are passable (for example,
+    when a unit arrives at or leaves a tile) instead of searching again.
+
+    Like a SearchTree, this stores the cost of every tile reached and every
+    neighbour through which each tile is reached at that cost. This is
+    exactly what a fresh search would find. So after a repair, the reachable
+    set, the costs and the paths from tree() all match a fresh search.
+
+    A repair only visits the tiles whose cost changes. A blocked tile takes
+    with it the tiles that could only be reached through it, and those tiles
+    are searched for again from around their edge. A freed tile is searched
+    onward from the tiles next to it.
+
+    Matches a fresh search after random changes:
+    >>> import random, tiles
+    >>> t = tiles.TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/island.gif")
+    >>> rand = random.Random(18)
+    >>> n = len(t.positions)
+    >>> cost = lambda i: 1.5 if i % 7 == 0 else 1
+    >>> blocked = set(rand.sample(range(n), n // 4))
+    >>> passable = lambda i: i not in blocked
+    >>> start = t.index_of((12, 12))
+    >>> field = ReachField(t, start, 10, cost, passable, resolution = 2)
+    >>> matches = []
+    >>> for step in range(100):
+    ...     changed = rand.sample(range(n), 3)
+    ...     blocked.symmetric_difference_update(changed)
+    ...     field.repair(changed)
+    ...     reachable, tree = tiles.reachable_indexed(
+    ...         t, start, 10, cost, passable, return_tree = True)
+    ...     matches.append(field.reachable == reachable and
+    ...                    field.tree().costs == tree.costs and
+    ...                    all(field.tree().path_to(i) == tree.path_to(i)
+    ...                        for i in reachable))
+    >>> all(matches)
+    True
+    """
+    def __init__(self, graph, start, max_cost, cost, passable,
+                 resolution = None, open_cost = None):
+        """
+        The arguments are the same as those of reachable_indexed. cost and
+        passable are kept, and are expected to give the current state of the
+        map whenever repair is called.
+        """
+        self._graph = graph
+        self.start = start
+        self.max_cost = max_cost
+        self._cost = cost
+        self._passable = passable
+
+        self.reachable, tree = reach.reachable_indexed(
+            graph, start, max_cost, cost, passable, True, resolution,
+            open_cost)
+        self._costs = tree.costs
+        self._parents = tree.parents
+
+    def tree(self):
+        """
+        Returns a reach.SearchTree of the field as it is now. Later repairs
+        don't change trees which have already been returned.
+        """
+        # Repairs replace parent lists rather than changing them
+        return reach.SearchTree(
+            self._graph, self.start, list(self._costs), list(self._parents))
+
+    def repair(self, changed):
+        """
+        Brings the field up to date after the given tile indices may have
+        changed whether they are passable. Tiles which didn't change may be
+        included.
+        """
+        adjacency = self._graph._adjacency
+        costs, parents = self._costs, self._parents
+        cost, passable = self._cost, self._passable
+        max_cost = self.max_cost
+        reachable = self.reachable
+
+        # Tiles which can't be entered any more lose their cost, as does
+        # every tile which could only be reached through one that lost it
+        lost = []
+        todo = [i for i in changed
+                if i != self.start and i in reachable and not passable(i)]
+        while todo:
+            cur = todo.pop()
+            if cur not in reachable:
+                continue
+            reachable.discard(cur)
+            costs[cur] = parents[cur] = None
+            lost.append(cur)
+
+            for n in adjacency[cur]:
+                options = parents[n]
+                if options and cur in options:
+                    options = [p for p in options if p != cur]
+                    parents[n] = options
+                    if not options:
+                        todo.append(n)
+
+        # Those tiles, and tiles which can now be entered, are searched for
+        # again from their neighbours which still have a cost
+        frontier = pqueue.PQueue()
+        for i in lost + [i for i in changed if i not in reachable]:
+            if i == self.start or i in reachable or not passable(i):
+                continue
+
+            best, options = None, []
+            for n in adjacency[i]:
+                if costs[n] is None:
+                    continue
+                new_cost = costs[n] + cost(n)
+                if new_cost > max_cost:
+                    continue
+                if best is None or new_cost < best:
+                    best, options = new_cost, [n]
+                elif new_cost == best:
+                    options.append(n)
+
+            if best is not None:
+                reachable.add(i)
+                costs[i] = best
+                parents[i] = options
+                frontier.update(i, best)
+
+        # Then the search carries on from them as in reachable_indexed, but
+        # only through tiles whose cost goes down
+        while frontier:
+            cur, c = frontier.pop_smallest()
+            new_cost = c + cost(cur)
+            if new_cost > max_cost:
+                continue
+
+            for n in adjacency[cur]:
+                if n == self.start or not passable(n):
+                    continue
+
+                old_cost = costs[n]
+                if old_cost is None or new_cost < old_cost:
+                    reachable.add(n)
+                    costs[n] = new_cost
+                    parents[n] = [cur]
+                    frontier.update(n, new_cost)
+                elif new_cost == old_cost and cur not in parents[n]:
+                    parents[n] = parents[n] + [cur]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,412 @@
+from collections import namedtuple
+import helper
+
+# A container class which stores information about a tile.
+Tile = namedtuple('Tile', ['type',
+                           'sprite_id',
+                           'passable',
+                           'defense_bonus',
+                           'range_bonus'])
+
+# a dictionary of tile IDs associated with their type data
+tile_types = {
+    0:  Tile('plains', 0, True, 0, 0),
+    1:  Tile('wall', 1, False, 0, 0),
+    2:  Tile('water', 2, False, 0, 0),
+    3:  Tile('sand', 3, True, 0, 0),
+    4:  Tile('road', 4, True, 0, 0),
+    5:  Tile('mountain', 5, False, 1, 2),
+    6:  Tile('forest', 6, True, 2, 0)
+}
+
+# The rules of one kind of unit.
+# type: the name the unit is shown with
+# layer: the collision layer; units only block enemy units on the same layer
+# max_health, speed, damage, defense: the unit's stats
+# min_atk_range, max_atk_range: the distances it can attack at (inclusive)
+# move_costs: the cost of leaving each tile type, by name (1 if not listed)
+# impassable: the names of the tile types it can't move over
+# bonus_damage: extra damage against targets, by target type or layer
+# cant_hit: the layers of the units it can't attack
+# terrain_bonus: whether tiles add to its defense and range
+# max_fuel: the turns it can stay out without docking, or None if it doesn't
+#     need fuel
+# min_move_distance: the fewest tiles it must move before stopping, unless it
+#     stops where it can dock
+# docking: whether aircraft can dock on and next to it
+UnitSpec = namedtuple('UnitSpec', ['type',
+                                   'layer',
+                                   'max_health',
+                                   'speed',
+                                   'damage',
+                                   'defense',
+                                   'min_atk_range',
+                                   'max_atk_range',
+                                   'move_costs',
+                                   'impassable',
+                                   'bonus_damage',
+                                   'cant_hit',
+                                   'terrain_bonus',
+                                   'max_fuel',
+                                   'min_move_distance',
+                                   'docking'])
+
+# The rules every unit starts from
+BASE_SPEC = UnitSpec(type = "Base Unit",
+                     layer = None,
+                     max_health = 10,
+                     speed = 5,
+                     damage = 1,
+                     defense = 3,
+                     min_atk_range = 0,
+                     max_atk_range = 1,
+                     move_costs = {},
+                     impassable = frozenset(),
+                     bonus_damage = {},
+                     cant_hit = frozenset(),
+                     terrain_bonus = True,
+                     max_fuel = None,
+                     min_move_distance = 0,
+                     docking = False)
+
+# Ground units can't travel over water or through walls
+GROUND_SPEC = BASE_SPEC._replace(type = "Ground Unit",
+                                 layer = "ground",
+                                 impassable = frozenset(['water', 'wall']))
+
+# Water units can only travel over water
+WATER_SPEC = BASE_SPEC._replace(
+    type = "Water Unit",
+    layer = "water",
+    impassable = frozenset(t.type for t in tile_types.values()
+                           if t.type != 'water'))
+
+# Air units fly over anything, ignore terrain bonuses and need fuel
+AIR_SPEC = BASE_SPEC._replace(type = "Air Unit",
+                              layer = "air",
+                              terrain_bonus = False,
+                              max_fuel = 1,
+                              min_move_distance = 1)
+
+_JEEP_SPEC = GROUND_SPEC._replace(type = "Jeep",
+                                  speed = 10,
+                                  max_atk_range = 2,
+                                  damage = 5,
+                                  defense = 1,
+                                  move_costs = {'plains': 2,
+                                                'sand': 3,
+                                                'forest': 3,
+                                                'road': 1,
+                                                'mountain': 4})
+
+# The rules of every kind of unit, by the name used in level files
+UNIT_SPECS = {
+    "Tank": GROUND_SPEC._replace(
+        type = "Tank",
+        speed = 5,
+        max_atk_range = 2,
+        damage = 6,
+        defense = 3,
+        impassable = GROUND_SPEC.impassable | {'mountain', 'forest'},
+        cant_hit = frozenset(['air'])),
+    "Jeep": _JEEP_SPEC,
+    "SuperJeep": _JEEP_SPEC._replace(type = "Incredibly Fast Jeep",
+                                     speed = 100),
+    "Anti-Armour": GROUND_SPEC._replace(
+        type = "Anti-Armour",
+        speed = 4,
+        max_atk_range = 3,
+        damage = 4,
+        defense = 0,
+        move_costs = {'mountain': 2,
+                      'forest': 1.5,
+                      'sand': 1.5},
+        bonus_damage = {'Tank': 4, 'Battleship': 4},
+        cant_hit = frozenset(['air'])),
+    "Battleship": WATER_SPEC._replace(type = "Battleship",
+                                      speed = 8,
+                                      max_atk_range = 4,
+                                      damage = 6,
+                                      defense = 3),
+    "Carrier": WATER_SPEC._replace(type = "Carrier",
+                                   speed = 4,
+                                   max_atk_range = 2,
+                                   damage = 4,
+                                   defense = 2,
+                                   docking = True),
+    "Artillery": GROUND_SPEC._replace(
+        type = "Artillery",
+        speed = 6,
+        max_atk_range = 5,
+        min_atk_range = 3,
+        damage = 7,
+        defense = 1,
+        move_costs = {'plains': 1.5,
+                      'sand': 1.5,
+                      'road': 1,
+                      'mountain': 3},
+        impassable = GROUND_SPEC.impassable | {'forest'},
+        cant_hit = frozenset(['air'])),
+    "Fighter": AIR_SPEC._replace(type = "Fighter",
+                                 speed = 16,
+                                 max_atk_range = 4,
+                                 damage = 5,
+                                 defense = 3,
+                                 bonus_damage = {'air': 2},
+                                 max_fuel = 7,
+                                 min_move_distance = 6),
+    "Anti-Air": GROUND_SPEC._replace(
+        type = "Anti-Air",
+        speed = 6,
+        max_atk_range = 4,
+        damage = 2,
+        defense = 2,
+        move_costs = {'plains': 1.5,
+                      'sand': 1.5,
+                      'road': 1,
+                      'mountain': 3},
+        impassable = GROUND_SPEC.impassable | {'forest'},
+        bonus_damage = {'air': 7}),
+    "Bomber": AIR_SPEC._replace(type = "Bomber",
+                                speed = 10,
+                                max_atk_range = 1,
+                                damage = 4,
+                                defense = 4,
+                                bonus_damage = {'ground': 4, 'water': 3},
+                                cant_hit = frozenset(['air']),
+                                max_fuel = 10,
+                                min_move_distance = 4)
+}
+
+# A unit placed by a level file
+Placement = namedtuple('Placement', ['name', 'team', 'x', 'y', 'angle'])
+
+# The contents of a level file
+Level = namedtuple('Level', ['num_teams',
+                             'tile_file',
+                             'tile_size',
+                             'map_file',
+                             'units'])
+
+# The terrain movement rules of a kind of unit, compiled against every tile
+# type.
+# layer: the unit's collision layer
+# passable: whether each tile ID can be moved over, ignoring other units
+# costs: the cost of leaving each tile ID
+# Kinds of unit with identical rules share one (equal) profile, and so share
+# the grids which maps compile for it.
+MovementProfile = namedtuple('MovementProfile', ['layer',
+                                                 'passable',
+                                                 'costs'])
+
+# Profiles by the id of their spec, stored with the spec so that its id isn't
+# reused
+_spec_profiles = {}
+
+# Profiles by value, so that equal profiles are always the same object
+_profiles = {}
+
+# The functions below take units as any objects with a spec attribute (a
+# UnitSpec) and type, damage, defense, min_atk_range and max_atk_range
+# attributes, such as the units of a gamestate.GameState (and the unit
+# sprites showing them). The stats are read from the unit rather than its
+# spec, as a unit's stats may differ from those it started with.
+
+def is_terrain_passable(spec, tile):
+    """
+    Returns whether units with the given spec can move over the given tile,
+    regardless of any units on it.
+
+    >>> is_terrain_passable(UNIT_SPECS["Tank"], tile_types[6])
+    False
+    >>> is_terrain_passable(UNIT_SPECS["Fighter"], tile_types[1])
+    True
+    """
+    return tile.type not in spec.impassable
+
+def move_cost(spec, tile):
+    """
+    Returns the cost for units with the given spec of leaving the given tile.
+
+    >>> move_cost(UNIT_SPECS["Jeep"], tile_types[5])
+    4
+    >>> move_cost(UNIT_SPECS["Tank"], tile_types[5])
+    1
+    """
+    return spec.move_costs.get(tile.type, 1)
+
+def movement_profile(spec):
+    """
+    Returns the MovementProfile of units with the given spec. Specs are
+    assumed not to change, so this is only worked out once for each.
+
+    >>> movement_profile(UNIT_SPECS["Tank"]).passable
+    (True, False, False, True, True, False, False)
+    >>> movement_profile(UNIT_SPECS["Artillery"]).costs
+    (1.5, 1, 1, 1.5, 1, 3, 1)
+    >>> (movement_profile(UNIT_SPECS["Artillery"]) is
+    ...  movement_profile(UNIT_SPECS["Anti-Air"]))
+    True
+    """
+    entry = _spec_profiles.get(id(spec))
+
+    if entry is None:
+        types = [tile_types.get(i) for i in range(max(tile_types) + 1)]
+        profile = MovementProfile(
+            spec.layer,
+            tuple(bool(t and is_terrain_passable(spec, t)) for t in types),
+            tuple(move_cost(spec, t) if t else 1 for t in types))
+
+        entry = (spec, _profiles.setdefault(profile, profile))
+        _spec_profiles[id(spec)] = entry
+
+    return entry[1]
+
+def can_hit(attacker, target):
+    """
+    Returns whether the attacker is able to attack the target at all.
+    """
+    return target.spec.layer not in attacker.spec.cant_hit
+
+def get_defense(unit, tile = None):
+    """
+    Returns the unit's defense. If a tile is given, its defense bonus is added
+    for units which get terrain bonuses.
+    """
+    if tile and unit.spec.terrain_bonus:
+        return unit.defense + tile.defense_bonus
+    return unit.defense
+
+def attack_damage(attacker, target):
+    """
+    Returns the damage the attacker would do to the target before the
+    target's defense: its damage plus any bonus against the target, or 0 if it
+    can't hit the target.
+    """
+    if not can_hit(attacker, target):
+        return 0
+
+    bonuses = attacker.spec.bonus_damage
+    bonus = bonuses.get(target.type, bonuses.get(target.spec.layer, 0))
+
+    return attacker.damage + bonus
+
+def get_damage(attacker, target, target_tile):
+    """
+    Returns the damage the attacker would do to the target standing on the
+    given tile. This is 0 if it can't hit the target, and is never negative.
+    """
+    if not can_hit(attacker, target):
+        return 0
+
+    defense = get_defense(target, target_tile)
+
+    return max(attack_damage(attacker, target) - defense, 0)
+
+def range_bounds(unit, from_tile):
+    """
+    Returns a tuple of the smallest and largest distances (inclusive) at which
+    the unit can attack from the given tile, taking the tile's range bonus
+    into account for units which get terrain bonuses.
+    """
+    if unit.spec.terrain_bonus:
+        return (unit.min_atk_range,
+                unit.max_atk_range + from_tile.range_bonus)
+    return (unit.min_atk_range, unit.max_atk_range)
+
+def docking_area(pos):
+    """
+    Returns the tiles where aircraft can dock with a docking unit at the given
+    position: the unit's own tile and the 4 tiles next to it.
+    """
+    x, y = pos
+    return [(x, y), (x, y - 1), (x + 1, y), (x - 1, y), (x, y + 1)]
+
+def can_stop(spec, from_pos, pos, docked):
+    """
+    Returns whether a unit with the given spec which set off from from_pos may
+    stop at pos, as far as its minimum move distance goes. docked is whether
+    it could dock at pos.
+
+    >>> fighter = UNIT_SPECS["Fighter"]
+    >>> can_stop(fighter, (0, 0), (3, 2), False)
+    False
+    >>> can_stop(fighter, (0, 0), (3, 2), True)
+    True
+    """
+    if docked:
+        return True
+    return helper.manhattan_dist(from_pos, pos) >= spec.min_move_distance
+
+def can_turn_end(spec, moved, docked):
+    """
+    Returns whether a unit with the given spec lets its team's turn end, given
+    whether it has moved this turn and whether it is docked. Units which need
+    fuel must move or dock every turn.
+    """
+    return spec.max_fuel is None or moved or docked
+
+def fuel_after_turn(spec, fuel, docked):
+    """
+    Returns the fuel a unit with the given spec has once its team's turn ends,
+    given its fuel and whether it is docked. It is refuelled when docked, and
+    otherwise burns one turn's worth. A unit left with no fuel is destroyed.
+    Units which don't need fuel keep what they have.
+
+    >>> bomber = UNIT_SPECS["Bomber"]
+    >>> fuel_after_turn(bomber, 3, False), fuel_after_turn(bomber, 3, True)
+    (2, 10)
+    """
+    if spec.max_fuel is None:
+        return fuel
+    if docked:
+        return spec.max_fuel
+    return fuel - 1
+
+def read_level(filename):
+    """
+    Reads the level file with the given name and returns a Level.
+
+    >>> level = read_level("maps/island.lvl")
+    >>> level.num_teams, level.map_file, level.tile_size
+    (2, 'maps/island.gif', (20, 20))
+    >>> level.units[0]
+    Placement(name='Anti-Air', team=0, x=22, y=22, angle=180)
+    """
+    with open(filename, 'r') as map_file:
+        lines = iter(map_file.readlines())
+
+    def find(label, error):
+        """
+        Skips ahead to the line starting with label, and returns the rest of
+        that line.
+        """
+        for line in lines:
+            if line.startswith(label):
+                return line[len(label):].strip()
+        raise Exception(error)
+
+    num_teams = int(find("Teams: ", "Expected team count"))
+    tile_file = find("Tiles: ", "Expected tile file")
+    tile_w, tile_h = find("Tile size: ", "Expected tile size").split('x')
+    map_file = find("Map: ", "Expected map filename")
+    find("UNITS START", "Expected unit definitions")
+
+    units = []
+    for line in lines:
+        if line.find("UNITS END") >= 0:
+            break
+
+        name, team, x, y, angle = line.split()
+        if name not in UNIT_SPECS:
+            raise Exception("No unit of name {} found!".format(name))
+        units.append(Placement(name, int(team), int(x), int(y), int(angle)))
+    else:
+        raise Exception("Expected end of unit definitions")
+
+    return Level(num_teams, tile_file, (int(tile_w), int(tile_h)), map_file,
+                 units)
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,210 @@
+import numpy as np
+import damagetable, rules
+from gamestate import range_stencil
+
+class ThreatMap:
+    """
+    Every tile one team could attack on its next turn, by moving anywhere it
+    can stop (or staying put) and then attacking from there. grid is a NumPy
+    array indexed by [y, x] holding, for each tile, the most damage any of
+    the team's units could do there with an attack, or 0 where none can. It
+    can be passed straight to TileMap.set_highlight.
+
+    If a target unit is given, the damage is what it would take standing on
+    each tile, as damagetable works it out: bonus damage, units which can't
+    hit it and its defense (with the tile's bonus) are all taken into
+    account. Otherwise, each unit's damage is the most it could do to any
+    kind of unit before the target's defense (see damagetable.max_attack).
+
+    Move ranges come from GameState.move_range, which repairs each unit's
+    last search when only other units have moved.
+
+    update brings the grid up to date with the game. Only units which have
+    moved, or which could be affected by another unit arriving at or leaving
+    a tile near their move range, are worked out again.
+
+    >>> import gamestate
+    >>> game = gamestate.GameState.load_level("maps/island.lvl")
+    >>> for team in (0, 1):
+    ...     for u in list(game.team_units(team)):
+    ...         game.deactivate(u)
+    >>> jeep = game.add_unit("Jeep", 1, (12, 4))
+    >>> threat = ThreatMap(game, 1)
+    >>> int(threat.grid.max()), int(threat.grid[4, 12])
+    (5, 5)
+    >>> big = game.add_unit("Artillery", 1, (12, 5))
+    >>> threat.update()
+    >>> int(threat.grid.max())
+    7
+    >>> game.deactivate(big)
+    >>> threat.update()
+    >>> bool((threat.grid == ThreatMap(game, 1).grid).all())
+    True
+    >>> game.deactivate(jeep)
+    >>> threat.update()
+    >>> int(threat.grid.max())
+    0
+
+    Against a given target, units which can't hit it don't count, and bonus
+    damage and the target's defense do:
+    >>> aa = game.add_unit("Anti-Air", 1, (12, 4))
+    >>> tank = game.add_unit("Tank", 1, (22, 22))
+    >>> fighter = game.new_unit(rules.UNIT_SPECS["Fighter"], 0)
+    >>> air = ThreatMap(game, 1, target = fighter)
+    >>> int(air.grid[4, 12]), int(air.grid[22, 22])
+    (6, 0)
+    >>> int(ThreatMap(game, 1).grid[4, 12])
+    9
+    """
+    def __init__(self, game, team, target = None):
+        """
+        game: the gamestate.GameState to map
+        team: the team whose attacks to map
+        target: the gamestate.UnitState to work out the damage against, or
+                None
+        """
+        self._game = game
+        self.team = team
+        self.target = target
+
+        # Each unit's (position, damage, footprint, box), where the damage is
+        # as given by _damage, the footprint is a tuple of the y and x arrays
+        # of the tiles it threatens, and the box is the (x0, y0, x1, y1) area
+        # around its move range in which another unit could change where it
+        # can go
+        self._units = {}
+
+        # Where every unit on a tile was at the last update
+        self._positions = {}
+
+        # For each damage, how many units with it threaten each tile
+        self._counts = {}
+
+        # The defense bonus of every tile, indexed by [y, x]
+        self._bonuses = np.array([game.tile_at((x, y)).defense_bonus
+                                  for y in range(game.height)
+                                  for x in range(game.width)],
+                                 dtype = int).reshape(game.height, game.width)
+
+        self.grid = np.zeros((game.height, game.width), dtype = np.int32)
+        self.update()
+
+    def _footprint(self, unit):
+        """
+        Returns a tuple of the footprint and box (see _units) of the given
+        unit from where it stands.
+        """
+        game = self._game
+        reachable, _ = game.move_range(unit)
+
+        # The tiles it could attack from, grouped by range bounds
+        sources = {}
+        for pos in reachable:
+            if pos == unit.pos or game.is_stoppable(unit, pos):
+                bounds = rules.range_bounds(unit, game.tile_at(pos))
+                sources.setdefault(bounds, []).append(pos)
+
+        w, h = game.width, game.height
+        mask = np.zeros((h, w), dtype = bool)
+        for bounds, positions in sources.items():
+            dx, dy = range_stencil(*bounds)
+            px, py = np.array(positions, dtype = int).T
+            xs = (px[:, None] + dx).ravel()
+            ys = (py[:, None] + dy).ravel()
+            on_map = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+            mask[ys[on_map], xs[on_map]] = True
+
+        # A unit one tile beyond the move range can still block it
+        xs, ys = zip(*reachable)
+        box = (min(xs) - 1, min(ys) - 1, max(xs) + 1, max(ys) + 1)
+
+        return (np.nonzero(mask), box)
+
+    def _damage(self, unit):
+        """
+        Returns the damage the given unit would do with an attack. This is a
+        number, or with a target, a tuple of the damage on tiles of each
+        defense bonus (see damagetable.by_defense_bonus).
+        """
+        if self.target is None:
+            return damagetable.max_attack(unit)
+
+        damage = damagetable.by_defense_bonus(unit, self.target)
+        return damage if any(damage) else 0
+
+    def _damage_grid(self, damage):
+        """
+        Returns the given damage (see _damage) on every tile of the map, as a
+        number or a NumPy array indexed by [y, x].
+        """
+        if isinstance(damage, tuple):
+            return np.array(damage, dtype = np.int32)[self._bonuses]
+        return damage
+
+    def _add(self, damage, footprint, amount):
+        """
+        Adds amount to the count of units with the given damage threatening
+        each tile in the footprint.
+        """
+        counts = self._counts.get(damage)
+        if counts is None:
+            counts = np.zeros(self.grid.shape, dtype = np.int32)
+            self._counts[damage] = counts
+
+        counts[footprint] += amount
+
+    def update(self):
+        """
+        Brings the grid up to date with the positions of the units.
+        """
+        positions = {u: pos for pos, units in self._game._occupancy.items()
+                     for u in units}
+
+        # Tiles which a unit has arrived at or left
+        changed = []
+        for u in positions.keys() | self._positions.keys():
+            old, new = self._positions.get(u), positions.get(u)
+            if old != new:
+                changed += [p for p in (old, new) if p is not None]
+        self._positions = positions
+
+        # Units to forget, and units to work out again
+        stale = [u for u in self._units if not u.active]
+        todo = []
+        for u, pos in positions.items():
+            if u.team != self.team:
+                continue
+
+            entry = self._units.get(u)
+            if entry is None or entry[0] != pos:
+                todo.append(u)
+                continue
+
+            x0, y0, x1, y1 = entry[3]
+            if any(x0 <= x <= x1 and y0 <= y <= y1 for x, y in changed):
+                todo.append(u)
+
+        for u in stale + todo:
+            entry = self._units.pop(u, None)
+            if entry is not None and entry[1]:
+                self._add(entry[1], entry[2], -1)
+
+        for u in todo:
+            footprint, box = self._footprint(u)
+            damage = self._damage(u)
+            if damage:
+                self._add(damage, footprint, 1)
+            self._units[u] = (positions[u], damage, footprint, box)
+
+        # The highest damage threatening each tile
+        self.grid[:] = 0
+        for damage, counts in self._counts.items():
+            threatened = counts > 0
+            if threatened.any():
+                np.maximum(self.grid,
+                           np.where(threatened, self._damage_grid(damage), 0),
+                           out = self.grid)
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -1,26 +1,38 @@
 import pygame, sys, math
 import pygame.gfxdraw
-import pqueue, helper
+import numpy as np
+import pqueue, helper, unionfind, hpa, landmarks, flowfield, lrucache
 from pygame.sprite import Sprite
 from collections import namedtuple
+from rules import Tile, tile_types
+from reach import tie_key, SearchTree, cost_resolution, reachable_indexed
 
-# A container class which stores information about a tile.
-Tile = namedtuple('Tile', ['type',
-                           'sprite_id',
-                           'passable',
-                           'defense_bonus',
-                           'range_bonus'])
+# Cost and passability of every tile for one movement profile (see
+# rules.MovementProfile). The arrays are indexed by [y, x], while the lists are
+# indexed by tile index for use by the indexed pathfinding functions.
+ProfileGrids = namedtuple('ProfileGrids', ['cost',
+                                           'passable',
+                                           'cost_list',
+                                           'passable_list'])
 
-# a dictionary of tile IDs associated with their type data
-tile_types = {
-    0:  Tile('plains', 0, True, 0, 0),
-    1:  Tile('wall', 1, False, 0, 0),
-    2:  Tile('water', 2, False, 0, 0),
-    3:  Tile('sand', 3, True, 0, 0),
-    4:  Tile('road', 4, True, 0, 0),
-    5:  Tile('mountain', 5, False, 1, 2),
-    6:  Tile('forest', 6, True, 2, 0)
-}
+# The Tile fields which TileMap keeps as NumPy planes
+PLANE_FIELDS = ('sprite_id', 'passable', 'defense_bonus', 'range_bonus')
+
+def _property_table(field):
+    """
+    Returns an array mapping each tile ID to the value of the given Tile field,
+    so that a whole grid of tile IDs can be converted with one indexing
+    operation.
+    
+    >>> _property_table('defense_bonus')
+    array([0, 0, 0, 0, 0, 1, 2])
+    """
+    table = [getattr(tile_types[i], field) if i in tile_types else 0
+             for i in range(max(tile_types) + 1)]
+    return np.array(table)
+
+# The number of flow fields each TileMap keeps (see TileMap.flow_field)
+FLOW_FIELD_CACHE = 32
 
 HIGHLIGHT_RATE = 0.0025
 GRID_COLOR = (0, 0, 0, 80)
@@ -46,6 +58,36 @@ class TileMap(Sprite):
         self._tiles = []
         self._highlights = {}
         
+        # Per-index lookups used by the integer-indexed pathfinding functions
+        self._coords = []
+        self._adjacency = []
+        self._tile_data = []
+        
+        # The tile IDs as a (height, width) array, and one array of the same
+        # shape per field in PLANE_FIELDS
+        self._terrain = None
+        self._planes = {}
+        
+        # ProfileGrids for each movement profile which has been requested
+        self._profile_grids = {}
+        
+        # Connected components of passable terrain by movement profile
+        self._components = {}
+        
+        # hpa.Hierarchy objects by movement profile
+        self._hierarchies = {}
+        
+        # landmarks.Landmarks heuristics by movement profile
+        self._landmarks = {}
+        
+        # The most recently used flowfield.FlowField objects by movement
+        # profile and goal, with the version of the map they were made for
+        self._flow_fields = lrucache.LRUCache(FLOW_FIELD_CACHE)
+        
+        # Goes up by one whenever any tile changes, so that anything worked
+        # out from the tiles can tell whether it is out of date
+        self.version = 0
+        
         Sprite.__init__(self)
         
         # These are required for a pygame Sprite
@@ -139,32 +181,83 @@ class TileMap(Sprite):
         
         # draw in each tile
         for i in range(self._tile_count()):
-            tile_id = tile_types[self._tiles[i]].sprite_id
-            
-            # get its position from its index in the list
-            x, y = self._tile_position(i)
-            x *= self._tile_width
-            y *= self._tile_height
-            
-            # determine which subsection to draw based on the sprite id
-            area = pygame.Rect(
-                tile_id * self._tile_width,
-                0,
-                self._tile_width,
-                self._tile_height
-            )
+            self._render_tile(i)
             
-            # draw the tile
-            self._base_image.blit(self._sprite_sheet, (x, y), area)
+    def _render_tile(self, i):
+        """
+        Draws the tile with the given index onto the base image.
+        """
+        tile_id = tile_types[self._tiles[i]].sprite_id
+        
+        # get its position from its index in the list
+        x, y = self._tile_position(i)
+        x *= self._tile_width
+        y *= self._tile_height
+        
+        # determine which subsection to draw based on the sprite id
+        area = pygame.Rect(
+            tile_id * self._tile_width,
+            0,
+            self._tile_width,
+            self._tile_height
+        )
+        
+        # draw the tile
+        self._base_image.blit(self._sprite_sheet, (x, y), area)
             
     def _set_tiles(self, tiles):
         """
         Sets the list of tiles.
         """
         self._tiles = tiles[:]
+        self._tile_data = [tile_types[t] for t in self._tiles]
+        
+        # Set up the array versions of the tiles
+        self._terrain = np.array(self._tiles).reshape(
+            (self._map_height, self._map_width))
+        self._planes = {field: _property_table(field)[self._terrain]
+                        for field in PLANE_FIELDS}
+        self._profile_grids = {}
+        self._components = {}
+        self._hierarchies = {}
+        self._landmarks = {}
+        self._flow_fields.clear()
+        self.version += 1
+        
+        # The graph structure only depends on the map size
+        self._build_adjacency()
         
         # The image now needs to be redrawn
         self._render_base_image()
+        
+    def _build_adjacency(self):
+        """
+        Precomputes the coordinates of every tile index and the indices of
+        its neighbours, in the same order as neighbours() returns them.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> t._adjacency[0]
+        (1, 5)
+        >>> t._adjacency[6]
+        (1, 7, 5, 11)
+        >>> t._coords[6]
+        (1, 1)
+        """
+        w, h = self._map_width, self._map_height
+        self._coords = [(i % w, i // w) for i in range(w * h)]
+        
+        adjacency = []
+        for i, (x, y) in enumerate(self._coords):
+            # Only add the neighbours which are on the map
+            n = []
+            if y > 0: n.append(i - w)
+            if x < w - 1: n.append(i + 1)
+            if x > 0: n.append(i - 1)
+            if y < h - 1: n.append(i + w)
+            adjacency.append(tuple(n))
+            
+        self._adjacency = adjacency
             
     def get_tiles(self):
         """
@@ -196,20 +289,360 @@ class TileMap(Sprite):
         
         # Load in the map image.
         map_image = pygame.image.load(filename)
-        self._map_width, self._map_height = map_image.get_size()
-        self.rect.w = self._map_width * self._tile_width
-        self.rect.h = self._map_height * self._tile_height
         
         # Go through the image adding tiles
-        map_tiles = []
         for y in range(map_image.get_height()):
             for x in range(map_image.get_width()):
                 # The tile number corresponds to the pixel colour index
                 tiles.append(map_image.get_at_mapped((x, y)))
         
+        # Set the tiles
+        self.load_from_list(tiles, *map_image.get_size())
+        
+    def load_from_list(self, tiles, width, height):
+        """
+        Loads tile data from a list of tile IDs in row order, for a map of the
+        given size in tiles. This is mostly useful for generated maps.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_list([0, 1, 2, 3, 4, 5], 3, 2)
+        >>> t.rect
+        <rect(0, 0, 60, 40)>
+        >>> t.tile_data((2, 1)).type
+        'mountain'
+        """
+        self._map_width, self._map_height = width, height
+        self.rect.w = self._map_width * self._tile_width
+        self.rect.h = self._map_height * self._tile_height
+        
         # Set the tiles
         self._set_tiles(tiles)
         
+    @property
+    def terrain(self):
+        """
+        The map's tile IDs as a NumPy array indexed by [y, x]. This should be
+        treated as read-only.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> t.terrain.shape
+        (5, 5)
+        >>> t.terrain[1].tolist()
+        [5, 6, 0, 0, 0]
+        """
+        return self._terrain
+        
+    def tile_plane(self, field):
+        """
+        Returns an array indexed by [y, x] holding the given Tile field (one of
+        PLANE_FIELDS) for every tile on the map. This should be treated as
+        read-only.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> t.tile_plane('passable')[0].tolist()
+        [True, False, False, True, True]
+        >>> t.tile_plane('range_bonus')[1].tolist()
+        [2, 0, 0, 0, 0]
+        
+        The defense bonus under a group of tiles:
+        >>> xs, ys = [0, 1, 2], [1, 1, 1]
+        >>> t.tile_plane('defense_bonus')[ys, xs].tolist()
+        [1, 2, 0]
+        """
+        return self._planes[field]
+        
+    @property
+    def positions(self):
+        """
+        A list of the (x, y) coordinates of every tile, indexed by tile index.
+        This should be treated as read-only.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> t.positions[7]
+        (2, 1)
+        """
+        return self._coords
+        
+    def index_of(self, coords):
+        """
+        Returns the tile index of the given tile coordinates for use with the
+        indexed pathfinding functions, or -1 if the tile doesn't exist.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> t.index_of((2, 1))
+        7
+        >>> t.index_of((5, 1))
+        -1
+        """
+        return self._tile_index(coords)
+        
+    def profile_grids(self, profile):
+        """
+        Returns the ProfileGrids for the given movement profile, compiling them
+        the first time each profile is requested.
+        
+        A profile is anything with a 'costs' and a 'passable' sequence, each
+        indexed by tile ID.
+        
+        >>> from collections import namedtuple
+        >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+        >>> p = Profile((1, 1, 1, 3, 1, 4, 2), (1, 0, 0, 1, 1, 1, 1))
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> grids = t.profile_grids(p)
+        >>> grids.cost[1].tolist()
+        [4, 2, 1, 1, 1]
+        >>> grids.passable_list[:5]
+        [True, False, False, True, True]
+        >>> t.profile_grids(p) is grids
+        True
+        """
+        grids = self._profile_grids.get(profile)
+        
+        if grids is None:
+            cost = np.array(profile.costs)[self._terrain]
+            passable = np.array(profile.passable, dtype = bool)[self._terrain]
+            grids = ProfileGrids(cost,
+                                 passable,
+                                 cost.ravel().tolist(),
+                                 passable.ravel().tolist())
+            self._profile_grids[profile] = grids
+            
+        return grids
+        
+    def components(self, profile):
+        """
+        Returns a UnionFind over tile indices in which two tiles are connected
+        if a unit with the given movement profile could travel between them,
+        ignoring other units. Impassable tiles are left on their own.
+        
+        This is built the first time each profile is requested, and is kept up
+        to date by set_tile.
+        """
+        components = self._components.get(profile)
+        
+        if components is None:
+            passable = self.profile_grids(profile).passable_list
+            components = unionfind.UnionFind(len(passable))
+            
+            # Only the right and down neighbours need joining, as the
+            # others are joined from their side
+            w = self._map_width
+            for i, p in enumerate(passable):
+                if not p:
+                    continue
+                if (i + 1) % w and passable[i + 1]:
+                    components.union(i, i + 1)
+                if i + w < len(passable) and passable[i + w]:
+                    components.union(i, i + w)
+                    
+            self._components[profile] = components
+            
+        return components
+        
+    def can_reach(self, profile, start, end):
+        """
+        Returns False if a unit with the given movement profile certainly can't
+        travel from the start tile index to the end tile index, or True if it
+        may be able to (as other units may still be in the way).
+        
+        >>> from collections import namedtuple
+        >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+        >>> ground = Profile((1,) * 7, (1, 0, 0, 1, 1, 1, 1))
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-3.gif")
+        >>> t.can_reach(ground, t.index_of((2, 0)), t.index_of((4, 1)))
+        True
+        >>> t.can_reach(ground, t.index_of((2, 0)), t.index_of((5, 0)))
+        True
+        >>> t.set_tile((5, 1), 1)
+        >>> t.can_reach(ground, t.index_of((2, 0)), t.index_of((5, 0)))
+        False
+        >>> t.set_tile((5, 1), 0)
+        >>> t.can_reach(ground, t.index_of((2, 0)), t.index_of((5, 0)))
+        True
+        """
+        if start == end:
+            return True
+        
+        # The end always has to be passable
+        passable = self.profile_grids(profile).passable_list
+        if not passable[end]:
+            return False
+        
+        # The start doesn't, in which case any of its neighbours will do
+        components = self.components(profile)
+        if passable[start]:
+            return components.connected(start, end)
+        
+        return any(passable[n] and components.connected(n, end)
+                   for n in self._adjacency[start])
+        
+    def hierarchy(self, profile, cluster_size = hpa.CLUSTER_SIZE):
+        """
+        Returns the hpa.Hierarchy for the given movement profile, building it
+        the first time each profile is requested. It is kept up to date by
+        set_tile, which only rebuilds the clusters around a changed tile.
+        
+        The cluster size is only used when the hierarchy is first built.
+        """
+        hierarchy = self._hierarchies.get(profile)
+        
+        if hierarchy is None:
+            hierarchy = hpa.Hierarchy(self, profile, cluster_size)
+            self._hierarchies[profile] = hierarchy
+            
+        return hierarchy
+        
+    def landmarks(self, profile):
+        """
+        Returns the landmarks.Landmarks heuristic for the given movement
+        profile, picking the landmarks the first time each profile is
+        requested. Its heuristic method can be passed to find_path_indexed.
+        
+        The landmarks are forgotten by set_tile whenever the profile's terrain
+        changes, as their cost tables could then overestimate.
+        
+        >>> from collections import namedtuple
+        >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+        >>> ground = Profile((1,) * 7, (1, 0, 0, 1, 1, 1, 1))
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-3.gif")
+        >>> alt = t.landmarks(ground)
+        >>> alt.heuristic(t.index_of((2, 0)), t.index_of((4, 1)))
+        15.0
+        >>> t.landmarks(ground) is alt
+        True
+        >>> t.set_tile((1, 1), 0)
+        >>> t.landmarks(ground) is alt
+        False
+        """
+        alt = self._landmarks.get(profile)
+        
+        if alt is None:
+            alt = landmarks.Landmarks(self, profile)
+            self._landmarks[profile] = alt
+            
+        return alt
+        
+    def flow_field(self, profile, goal):
+        """
+        Returns the flowfield.FlowField of paths to the goal tile index for the
+        given movement profile, from which the paths of any number of units
+        to the goal can be read. The most recently used flow fields are kept
+        until any tile changes.
+        
+        >>> from collections import namedtuple
+        >>> Profile = namedtuple('Profile', ['costs', 'passable'])
+        >>> ground = Profile((1,) * 7, (1, 0, 0, 1, 1, 1, 1))
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-3.gif")
+        >>> field = t.flow_field(ground, t.index_of((4, 1)))
+        >>> field.path((2, 0)) == find_path(t, (2, 0), (4, 1),
+        ...     passable = lambda c: t.tile_data(c).passable)
+        True
+        >>> t.flow_field(ground, t.index_of((4, 1))) is field
+        True
+        >>> t.set_tile((1, 1), 0)
+        >>> t.flow_field(ground, t.index_of((4, 1))) is field
+        False
+        """
+        key = (profile, goal)
+        entry = self._flow_fields.get(key)
+        
+        if entry is None or entry[0] != self.version:
+            entry = (self.version, flowfield.FlowField(self, profile, goal))
+            self._flow_fields.put(key, entry)
+            
+        return entry[1]
+        
+    def set_tile(self, coords, tile_id):
+        """
+        Changes the tile at the given coordinates to the given tile ID,
+        updating everything derived from the tiles. Raises an IndexError if
+        the coordinates aren't on the map.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-2.gif")
+        >>> t.set_tile((1, 2), 6)
+        >>> t.tile_data((1, 2)).type
+        'forest'
+        >>> int(t.tile_plane('defense_bonus')[2, 1])
+        2
+        >>> version = t.version
+        >>> t.set_tile((1, 2), 0)
+        >>> t.version == version + 1
+        True
+        >>> t.set_tile((5, 0), 6)
+        Traceback (most recent call last):
+            ...
+        IndexError: (5, 0) is not on the map
+        """
+        i = self._tile_index(coords)
+        if i < 0:
+            raise IndexError("{} is not on the map".format(coords))
+        
+        x, y = self._coords[i]
+        old_id = self._tiles[i]
+        if old_id == tile_id:
+            return
+        
+        self.version += 1
+        self._tiles[i] = tile_id
+        self._tile_data[i] = tile_types[tile_id]
+        self._terrain[y, x] = tile_id
+        for field, plane in self._planes.items():
+            plane[y, x] = getattr(tile_types[tile_id], field)
+            
+        for profile, grids in self._profile_grids.items():
+            was_passable = grids.passable_list[i]
+            was_cost = grids.cost_list[i]
+            passable = bool(profile.passable[tile_id])
+            
+            grids.cost[y, x] = grids.cost_list[i] = profile.costs[tile_id]
+            grids.passable[y, x] = grids.passable_list[i] = passable
+            
+            if passable != was_passable or grids.cost_list[i] != was_cost:
+                hierarchy = self._hierarchies.get(profile)
+                if hierarchy is not None:
+                    hierarchy.tile_changed(i)
+                self._landmarks.pop(profile, None)
+            
+            # Keep the connected components up to date
+            components = self._components.get(profile)
+            if components is None or passable == was_passable:
+                continue
+            
+            if passable:
+                # A new passable tile just joins its neighbours together
+                for n in self._adjacency[i]:
+                    if grids.passable_list[n]:
+                        components.union(i, n)
+            else:
+                # Sets can't be split, so rebuild these when next needed
+                del self._components[profile]
+        
+        self._render_tile(i)
+        
+    def tiles_of_type(self, type_name):
+        """
+        Returns a boolean array indexed by [y, x] which is True wherever the
+        tile has the given type name.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> [a.tolist() for a in t.tiles_of_type('forest').nonzero()]
+        [[1], [1]]
+        >>> int(t.tiles_of_type('plains').sum())
+        19
+        """
+        ids = [i for i, tile in tile_types.items() if tile.type == type_name]
+        return np.isin(self._terrain, ids)
+        
     def get_tile_size(self):
         """
         Returns a tuple containing a tile's width and height within this map.
@@ -221,6 +654,17 @@ class TileMap(Sprite):
         """
         return (self._tile_width, self._tile_height)
         
+    def get_map_size(self):
+        """
+        Returns a tuple containing the map's width and height, in tiles.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> t.get_map_size()
+        (5, 5)
+        """
+        return (self._map_width, self._map_height)
+        
     def tile_coords(self, screen_coords):
         """
         Returns the tile coordinates within this TileMap that the given screen
@@ -266,9 +710,7 @@ class TileMap(Sprite):
         """
         if not self._tile_exists(coords): return False
         
-        index = self._tile_index(coords)
-        
-        return tile_types[self._tiles[index]]
+        return self._tile_data[self._tile_index(coords)]
         
     def neighbours(self, coords):
         """
@@ -302,7 +744,23 @@ class TileMap(Sprite):
         Sets the given list of tile coordinates to be highlighted in the given
         color and wave between the first and second colors.
         It will be stored under the given name.
+        
+        Instead of a list, tiles can be a NumPy array indexed by [y, x] (such
+        as a threat.ThreatMap grid), in which case every tile where it is
+        non-zero is highlighted.
+        
+        >>> t = TileMap("assets/tiles.png", 20, 20)
+        >>> t.load_from_file("maps/test-1.gif")
+        >>> grid = np.zeros((5, 5))
+        >>> grid[1, 3] = 2
+        >>> t.set_highlight("threat", (0, 0, 0), (0, 0, 0), grid)
+        >>> t._highlights["threat"][0]
+        [(3, 1)]
         """
+        if isinstance(tiles, np.ndarray):
+            ys, xs = np.nonzero(tiles)
+            tiles = list(zip(xs.tolist(), ys.tolist()))
+            
         self._highlights[name] = (tiles, colorA, colorB)
         
     def remove_highlight(self, name):
@@ -390,40 +848,42 @@ def better_tile(a, b, start, end):
     >>> better_tile((3, 1), (5, 1), (4, 0), (4, 4))
     True
     """
-    dist_a = round(helper.squared_segment_dist(a, start, end), 3)
-    dist_b = round(helper.squared_segment_dist(b, start, end), 3)
+    return tie_key(a, start, end) < tie_key(b, start, end)
+    
+def _unit_cost(node):
+    """
+    The default cost function of the pathfinding functions, which costs 1 to
+    leave any node. find_path_indexed recognises this function to know that
+    every path with the fewest steps is a shortest path.
+    """
+    return 1
     
-    # Choose the lowest difference from the line
-    if dist_a < dist_b:
-        return True
-    elif dist_a > dist_b:
-        return False
-    else:
-        # Still a tie - choose lowest Y
-        if a[1] < b[1]:
-            return True
-        elif a[1] > b[1]:
-            return False
-        else:
-            # Still a tie - choose lowest X
-            if a[0] < b[0]:
-                return True
-            else:
-                return False
-            
 def find_path(graph,
                 start,
                 end,
-                cost = lambda pos: 1,
+                cost = _unit_cost,
                 passable = lambda pos: True,
-                heuristic = helper.manhattan_dist):
+                heuristic = helper.manhattan_dist,
+                profile = None,
+                bidirectional = False):
     """
     Returns the path between two nodes as a list of nodes using the A*
     algorithm.
     If no path could be found, an empty list is returned.
     
+    If the movement profile which passable is based on is given, the map's
+    connected components for it are checked first, so that a path which
+    can't exist is rejected without searching.
+    
+    If bidirectional is True, the path is found by searching from both ends at
+    once instead (see find_path_indexed), which can explore far fewer nodes
+    on long paths. The path costs the same, but may take a different route.
+    
     The cost function is how much it costs to leave the given node. This should
     always be greater than or equal to 1, or shortest path is not guaranteed.
+    If every node costs the same (the cost function is the default, or the
+    profile's passable tiles all have the same cost) and the default heuristic
+    is used, A* can sometimes be skipped: see find_path_indexed.
     
     The passable function returns whether the given node is passable.
     
@@ -432,6 +892,9 @@ def find_path(graph,
     take longer to compute the path. Overestimates lead to faster path
     computations, but may not give an optimal path.
     
+    This is a wrapper around find_path_indexed which takes and returns (x, y)
+    tile coordinates.
+    
     Code based on algorithm described in:
     http://www.policyalmanac.org/games/aStarTutorial.htm
     
@@ -454,51 +917,140 @@ def find_path(graph,
     ... (5, 3), (5, 2), (5, 1), (4, 1)]
     True
     """
-    # tiles to check (tuples of (x, y), cost)
-    todo = pqueue.PQueue()
-    todo.update(start, 0)
+    start_i = graph._tile_index(start)
+    end_i = graph._tile_index(end)
     
-    # tiles we've been to
-    visited = set()
+    # There's no way to get to or from a tile that isn't on the map
+    if start_i < 0 or end_i < 0:
+        return []
     
-    # associated G and H costs for each tile (tuples of G, H)
-    costs = { start: (0, heuristic(start, end)) }
+    coords = graph._coords
     
-    # parents for each tile
-    parents = {}
+    # Pass the defaults on as they are so that find_path_indexed can tell
+    path = find_path_indexed(
+        graph,
+        start_i,
+        end_i,
+        cost if cost is _unit_cost else lambda i: cost(coords[i]),
+        lambda i: passable(coords[i]),
+        None if heuristic is helper.manhattan_dist else
+            lambda a, b: heuristic(coords[a], coords[b]),
+        profile,
+        bidirectional)
     
-    while todo and (end not in visited):
-        todo.tie_breaker = lambda a,b: better_tile(a, b, start, end)
+    return [coords[i] for i in path]
     
+def find_path_indexed(graph,
+                        start,
+                        end,
+                        cost = _unit_cost,
+                        passable = lambda i: True,
+                        heuristic = None,
+                        profile = None,
+                        bidirectional = False):
+    """
+    Returns the path between two tile indices as a list of tile indices using
+    the A* algorithm. This is the same as find_path, except that every node
+    (including those passed to the cost, passable and heuristic functions) is a
+    flat index into the map's tile list rather than an (x, y) tuple.
+    
+    If no heuristic is given, the Manhattan distance is used.
+    
+    If bidirectional is True, a search forward from the start and a search
+    backward from the end are run in turns until the cheapest path where they
+    meet is known to be the cheapest overall (see _find_path_bidirectional).
+    
+    When every tile costs the same to leave, so that any path with the fewest
+    steps is a shortest path, and the default heuristic is used, the staircase
+    of steps towards the end which better_tile picks at each tile is tried
+    first. If it's passable, it's returned directly instead of searching. This
+    is exactly the path A* would give, as no path can be shorter.
+    
+    >>> t = TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/test-2.gif")
+    >>> find_path_indexed(t, 0, 24)
+    [0, 1, 6, 7, 12, 13, 18, 19, 24]
+    >>> find_path_indexed(t, 0, 24, lambda i: 1)
+    [0, 1, 6, 7, 12, 13, 18, 19, 24]
+    
+    Uniform costs give the same paths as A* on random maps:
+    >>> import random
+    >>> rand = random.Random(9)
+    >>> t.load_from_file("maps/island.gif")
+    >>> n = len(t.positions)
+    >>> same = []
+    >>> for trial in range(300):
+    ...     blocked = set(rand.sample(range(n), n // 4))
+    ...     passable = lambda i: i not in blocked
+    ...     start, end = rand.sample(sorted(set(range(n)) - blocked), 2)
+    ...     a_star = find_path_indexed(t, start, end, lambda i: 1, passable)
+    ...     path = find_path_indexed(t, start, end, passable = passable)
+    ...     same.append(path == a_star)
+    >>> all(same)
+    True
+    """
+    # Don't bother searching if the terrain makes the end unreachable
+    if profile is not None and not graph.can_reach(profile, start, end):
+        return []
+    
+    if bidirectional:
+        return _find_path_bidirectional(
+            graph, start, end, cost, passable, heuristic)
+    
+    if heuristic is None and _uniform_cost(cost, profile):
+        path = _staircase_path(graph, start, end, passable)
+        if path:
+            return path
+    
+    coords = graph._coords
+    adjacency = graph._adjacency
+    end_pos = coords[end]
+    
+    if heuristic is None:
+        heuristic = lambda a, b: helper.manhattan_dist(coords[a], coords[b])
+    
+    # tiles to check, with ties going to the tile closest to a straight line
+    start_pos = coords[start]
+    todo = pqueue.PQueue(
+        tie_key = lambda i: tie_key(coords[i], start_pos, end_pos))
+    todo.update(start, 0)
+    
+    # per-tile state: 0 = unseen, 1 = in the queue, 2 = visited
+    state = bytearray(len(coords))
+    state[start] = 1
+    
+    # G costs and parents for each tile
+    g_costs = [0] * len(coords)
+    parents = [-1] * len(coords)
+    
+    while todo and not state[end] == 2:
         cur, c = todo.pop_smallest()
-        visited.add(cur)
+        state[cur] = 2
+        
+        # the cost of leaving this tile is the same for every neighbour
+        g = g_costs[cur] + cost(cur)
         
         # check neighbours
-        for n in graph.neighbours(cur):
+        for n in adjacency[cur]:
             # skip it if we've already checked it, or if it isn't passable
-            if ((n in visited) or
-                (not passable(n))):
+            n_state = state[n]
+            if n_state == 2 or not passable(n):
                 continue
                 
-            if not (n in todo):
+            if n_state == 0:
                 # we haven't looked at this tile yet, so calculate its costs
-                g = costs[cur][0] + cost(cur)
-                h = heuristic(n, end)
-                costs[n] = (g, h)
+                state[n] = 1
+                g_costs[n] = g
+                parents[n] = cur
+                todo.update(n, g + heuristic(n, end))
+            elif g < g_costs[n]:
+                # we've found a better path, so update it
+                todo.update(n, g + heuristic(n, end))
+                g_costs[n] = g
                 parents[n] = cur
-                todo.update(n, g + h)
-            else:
-                # if we've found a better path, update it
-                g, h = costs[n]
-                new_g = costs[cur][0] + cost(cur)
-                if new_g < g:
-                    g = new_g
-                    todo.update(n, g + h)
-                    costs[n] = (g, h)
-                    parents[n] = cur
     
     # we didn't find a path
-    if end not in visited:
+    if state[end] != 2:
         return []
     
     # build the path backward
@@ -511,17 +1063,225 @@ def find_path(graph,
     
     return path
     
+def _find_path_bidirectional(graph, start, end, cost, passable, heuristic):
+    """
+    The bidirectional search for find_path_indexed. Returns the path between
+    two tile indices as a list of tile indices, or an empty list if there is
+    none.
+    
+    The backward search works out the cost of getting from each tile to the
+    end. As the cost of a step is that of the tile being left, stepping
+    backward from a tile onto its neighbour costs the neighbour's cost: the
+    cost of entering the tile it stepped back from.
+    
+    Both searches are guided by the same potential, half of the estimated cost
+    to the end less half of the estimated cost from the start. With this, the
+    searches are Dijkstra's algorithm over costs adjusted so that every step
+    still costs at least 0, and the cheapest path is known as soon as the
+    two smallest priorities add up to the cheapest path found where the
+    searches meet.
+    
+    >>> t = TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/test-3.gif")
+    >>> passable = lambda i: t.tile_data(t.positions[i]).passable
+    >>> path = find_path_indexed(t, t.index_of((2, 0)), t.index_of((4, 1)),
+    ...                          lambda i: 1, passable, bidirectional = True)
+    >>> [t.positions[i] for i in path] == [(2, 0), (1, 0), (0, 0), (0, 1),
+    ... (0, 2), (1, 2), (2, 2), (3, 2), (3, 3), (3, 4), (4, 4), (5, 4), (5, 3),
+    ... (5, 2), (5, 1), (4, 1)]
+    True
+    
+    Uneven costs give the same cost as A*:
+    >>> t.load_from_file("maps/test-2.gif")
+    >>> cost = lambda i: 1 + i % 3
+    >>> one_way = find_path_indexed(t, 20, 4, cost)
+    >>> two_way = find_path_indexed(t, 20, 4, cost, bidirectional = True)
+    >>> sum(map(cost, one_way[:-1])), sum(map(cost, two_way[:-1]))
+    (16, 16)
+    >>> find_path_indexed(t, 20, 4, cost, lambda i: i % 5 != 2,
+    ...                   bidirectional = True)
+    []
+    """
+    if start == end:
+        return [start]
+    if not passable(end):
+        return []
+    
+    coords = graph._coords
+    adjacency = graph._adjacency
+    
+    if heuristic is None:
+        heuristic = lambda a, b: helper.manhattan_dist(coords[a], coords[b])
+    potential = lambda i: (heuristic(i, end) - heuristic(start, i)) / 2
+    
+    # The forward search's costs from the start and parents, and the backward
+    # search's costs to the end and the tiles to step to from each tile
+    forward = pqueue.PQueue()
+    forward.update(start, potential(start))
+    f_costs = [None] * len(coords)
+    f_costs[start] = 0
+    parents = [-1] * len(coords)
+    
+    backward = pqueue.PQueue()
+    backward.update(end, -potential(end))
+    b_costs = [None] * len(coords)
+    b_costs[end] = 0
+    children = [-1] * len(coords)
+    
+    # tiles each search has finished with
+    f_done = bytearray(len(coords))
+    b_done = bytearray(len(coords))
+    
+    # the cheapest path found so far, and the tile where its halves meet
+    best = None
+    meet = -1
+    
+    while forward and backward:
+        if (best is not None and forward.peek_smallest()[1] +
+            backward.peek_smallest()[1] >= best):
+            break
+        
+        # Grow whichever search has the smaller frontier
+        if len(forward) <= len(backward):
+            cur, c = forward.pop_smallest()
+            f_done[cur] = 1
+            g = f_costs[cur] + cost(cur)
+            
+            for n in adjacency[cur]:
+                if f_done[n] or not passable(n):
+                    continue
+                
+                if f_costs[n] is None or g < f_costs[n]:
+                    f_costs[n] = g
+                    parents[n] = cur
+                    forward.update(n, g + potential(n))
+                    
+                    # see if this joins up with the backward search
+                    if b_costs[n] is not None and (
+                        best is None or g + b_costs[n] < best):
+                        best = g + b_costs[n]
+                        meet = n
+        else:
+            cur, c = backward.pop_smallest()
+            b_done[cur] = 1
+            
+            # Nothing comes before the start
+            if cur == start:
+                continue
+            
+            for n in adjacency[cur]:
+                # The start is the only tile a path can leave without being
+                # able to enter it
+                if b_done[n] or not (n == start or passable(n)):
+                    continue
+                
+                g = b_costs[cur] + cost(n)
+                if b_costs[n] is None or g < b_costs[n]:
+                    b_costs[n] = g
+                    children[n] = cur
+                    backward.update(n, g - potential(n))
+                    
+                    if f_costs[n] is not None and (
+                        best is None or g + f_costs[n] < best):
+                        best = g + f_costs[n]
+                        meet = n
+    
+    # we didn't find a path
+    if best is None:
+        return []
+    
+    # build the path backward from where the searches met, then forward
+    path = []
+    cur = meet
+    while cur != start:
+        path.append(cur)
+        cur = parents[cur]
+    path.append(start)
+    path.reverse()
+    
+    cur = meet
+    while cur != end:
+        cur = children[cur]
+        path.append(cur)
+    
+    return path
+    
+def _uniform_cost(cost, profile):
+    """
+    Returns whether the given cost function of find_path_indexed is known to
+    cost the same for every tile it will be asked about.
+    """
+    if cost is _unit_cost:
+        return True
+    
+    # The cost function of a profile's grids is only called on its passable
+    # tiles (and the start)
+    if profile is not None:
+        costs = set(c for c, p in zip(profile.costs, profile.passable) if p)
+        return len(costs) == 1
+    
+    return False
+    
+def _staircase_path(graph, start, end, passable):
+    """
+    Returns the path from start to end (as tile indices) made by always
+    stepping towards the end along whichever axis better_tile prefers, or an
+    empty list if the path runs into an impassable tile. Such a path has the
+    fewest possible steps, and it's the one A* breaks its ties towards.
+    
+    >>> t = TileMap("assets/tiles.png", 20, 20)
+    >>> t.load_from_file("maps/test-2.gif")
+    >>> _staircase_path(t, 0, 24, lambda i: True)
+    [0, 1, 6, 7, 12, 13, 18, 19, 24]
+    >>> _staircase_path(t, 0, 24, lambda i: i != 7)
+    []
+    """
+    coords = graph._coords
+    w = graph._map_width
+    start_pos = coords[start]
+    end_x, end_y = coords[end]
+    
+    x, y = start_pos
+    dx = (end_x > x) - (end_x < x)
+    dy = (end_y > y) - (end_y < y)
+    
+    path = [start]
+    while x != end_x or y != end_y:
+        if x == end_x:
+            y += dy
+        elif y == end_y:
+            x += dx
+        elif better_tile((x + dx, y), (x, y + dy), start_pos, (end_x, end_y)):
+            x += dx
+        else:
+            y += dy
+        
+        i = y * w + x
+        if not passable(i):
+            return []
+        path.append(i)
+    
+    return path
+    
 def reachable_tiles(graph,
                       start,
                       max_cost,
                       cost = lambda pos: 1,
-                      passable = lambda pos: True):
+                      passable = lambda pos: True,
+                      return_tree = False):
     """
     Returns a set of nodes which can be reached with a total cost of max_cost.
     The cost function is how much it costs to leave the given node. This should
     always be greater than or equal to 1, or shortest path is not guaranteed.
     The passable function returns whether the given node.
     
+    If return_tree is True, a tuple of the set and the SearchTree of the search
+    is returned instead, so that paths to the tiles can be found without
+    searching again.
+    
+    This is a wrapper around reachable_indexed which takes and returns (x, y)
+    tile coordinates.
+    
     Example use:
     >>> t = TileMap("assets/tiles.png", 20, 20)
     >>> t.load_from_file("maps/test-2.gif")
@@ -539,37 +1299,28 @@ def reachable_tiles(graph,
     >>> reachable_tiles(t, (2, 0), 6, cost, passable) == set([(3, 0), (2, 0),
     ... (1, 0), (0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 2), (2, 2)])
     True
+    
+    >>> reachable, tree = reachable_tiles(t, (2, 0), 6, cost, passable, True)
+    >>> tree.path((2, 2))
+    [(2, 0), (1, 0), (0, 0), (0, 1), (0, 2), (1, 2), (2, 2)]
     """
-    # tiles to check (tuples of x, y)
-    todo = pqueue.PQueue()
-    todo.update(start, 0)
+    start_i = graph._tile_index(start)
     
-    # tiles we've been to
-    visited = set()
+    # Nothing else can be reached from off the map
+    if start_i < 0:
+        return (set([start]), None) if return_tree else set([start])
     
-    # tiles which we can get to within max_cost
-    reachable = set()
-    reachable.add(start)
+    coords = graph._coords
+    result = reachable_indexed(graph,
+                               start_i,
+                               max_cost,
+                               lambda i: cost(coords[i]),
+                               lambda i: passable(coords[i]),
+                               return_tree)
     
-    while todo:
-        cur, c = todo.pop_smallest()
-        visited.add(cur)
+    if return_tree:
+        reachable, tree = result
+        return (set(coords[i] for i in reachable), tree)
         
-        # it's too expensive to get here, so don't bother checking
-        if c > max_cost:
-            continue
-        
-        # check neighbours
-        for n in graph.neighbours(cur):
-            # skip it if it doesn't exist, if we've already checked it, or
-            # if it isn't passable
-            if ((n in visited) or
-                (not passable(n))):
-                continue
-            
-            # try updating the tile's cost
-            new_cost = c + cost(cur)
-            if todo.update(n, new_cost) and new_cost <= max_cost:
-                reachable.add(n)
+    return set(coords[i] for i in result)
     
-    return reachable
@@ -0,0 +1,71 @@
+class UnionFind:
+    """
+    A disjoint-set forest over the integers 0 to n - 1, using union by size
+    and path halving.
+
+    >>> u = UnionFind(5)
+    >>> u.union(0, 1)
+    True
+    >>> u.union(3, 4)
+    True
+    >>> u.union(1, 0)
+    False
+    >>> u.connected(0, 1)
+    True
+    >>> u.connected(1, 3)
+    False
+    >>> u.union(1, 4)
+    True
+    >>> u.connected(0, 3)
+    True
+    >>> u.size(4)
+    4
+    """
+    def __init__(self, n):
+        self._parent = list(range(n))
+        self._size = [1] * n
+
+    def find(self, a):
+        """
+        Returns the representative element of the set containing a.
+        """
+        parent = self._parent
+        while parent[a] != a:
+            # Point every other node on the way at its grandparent
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+
+        return a
+
+    def union(self, a, b):
+        """
+        Merges the sets containing a and b. Returns True if they were
+        separate sets, else False.
+        """
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return False
+
+        # Attach the smaller tree to the larger one
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+        return True
+
+    def connected(self, a, b):
+        """
+        Returns whether a and b are in the same set.
+        """
+        return self.find(a) == self.find(b)
+
+    def size(self, a):
+        """
+        Returns the number of elements in the set containing a.
+        """
+        return self._size[self.find(a)]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
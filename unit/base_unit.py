@@ -1,22 +1,129 @@
-import pygame, unit, helper, bmpfont, effects
+import pygame, unit, helper, bmpfont, effects, rules, gamestate
 from pygame.sprite import Sprite
 
 FRAME_MOVE_SPEED = 3/20
 SIZE = 20
 
+class TurnState:
+    """
+    A view of whether a unit has moved and attacked this turn, held in its
+    gamestate.UnitState. It can be read and written by index like the
+    [has moved, has attacked] list it stands in for.
+    
+    >>> u = BaseUnit(team = 0)
+    >>> u.turn_state[1] = True
+    >>> u.turn_state
+    [False, True]
+    >>> u.turn_state == [False, True]
+    True
+    >>> u.state.attacked
+    True
+    """
+    __slots__ = ('_state',)
+    
+    def __init__(self, state):
+        self._state = state
+    
+    def __len__(self):
+        return 2
+    
+    def __getitem__(self, i):
+        return (self._state.moved, self._state.attacked)[i]
+    
+    def __setitem__(self, i, value):
+        setattr(self._state, ('moved', 'attacked')[i], bool(value))
+    
+    def __iter__(self):
+        return iter([self[0], self[1]])
+    
+    def __eq__(self, other):
+        return list(self) == list(other)
+    
+    def __repr__(self):
+        return repr(list(self))
+
+def _stat(name):
+    """
+    Returns a property reading the given stat of a unit's state.
+    """
+    return property(lambda self: getattr(self._state, name))
+
 class BaseUnit(Sprite):
     """
     The basic representation of a unit from which all other unit types
-    extend. Has a graphical representation and moves around the screen as well
-    as storing and calculating information regarding movement and attacks for
-    its unit type.
+    extend. It is a view of a unit of a gamestate.GameState (its state),
+    which it draws and moves around the screen. The game holds everything
+    about the unit and works out the rules for it.
     
-    Note: self._base_image MUST be set in subclasses! This is the tilesheet
+    Note: _base_image MUST be set in subclasses! This is the tilesheet
     from which the unit renders its actual image.
+    
+    A unit only holds its state and what it needs to be drawn and moved
+    around the screen. Its stats are read from its state, and its sounds and
+    effects belong to its class, so units don't each keep a copy:
+    >>> from unit.jeep import Jeep
+    >>> jeep = Jeep(team = 0)
+    >>> jeep.speed, jeep.hit_sound, 'speed' in vars(jeep)
+    (10, 'MachineGunFire', False)
+    
+    pygame's Sprite has no __slots__, so every unit still has a __dict__,
+    which holds little more than what Sprite puts there.
+    
+    Whatever happens to a unit's state shows up on the unit once it is next
+    updated (see sync):
+    >>> game = gamestate.GameState([0] * 25, 5, 5, 2)
+    >>> jeep = Jeep(team = 0, tile_x = 1, tile_y = 1, activate = True,
+    ...             game = game)
+    >>> jeep.state is game.unit_at((1, 1)) and jeep.state.view is jeep
+    True
+    >>> game.place(jeep.state, (3, 1))
+    >>> jeep.state.health = 2
+    >>> jeep.update()
+    >>> jeep.tile_pos, jeep.health
+    ((3, 1), 2)
+    >>> game.deactivate(jeep.state)
+    >>> jeep.update()
+    >>> jeep in BaseUnit.active_units
+    False
     """
+    __slots__ = ('_state',
+                 '_turn_state',
+                 '_shown',
+                 '_moving',
+                 '_tile_x',
+                 '_tile_y',
+                 '_angle',
+                 '_path',
+                 'image',
+                 'rect')
     
     active_units = pygame.sprite.LayeredUpdates()
     
+    # The rules of this kind of unit (a rules.UnitSpec), which its state is
+    # made with
+    spec = rules.BASE_SPEC
+    
+    # The game which units join when they aren't given one. It has no map, so
+    # it only suits units which are drawn and moved around on their own.
+    # gui.GUI gives each level a game of its own.
+    game = gamestate.GameState([], 0, 0, 2)
+    
+    # A unit's stats, read from its state
+    type = _stat('type')
+    max_health = _stat('max_health')
+    speed = _stat('speed')
+    damage = _stat('damage')
+    defense = _stat('defense')
+    min_atk_range = _stat('min_atk_range')
+    max_atk_range = _stat('max_atk_range')
+    
+    # What is shown and heard when a unit moves, attacks and dies
+    hit_effect = None
+    die_effect = effects.Explosion
+    move_sound = None
+    hit_sound = None
+    die_sound = "Explosion"
+    
     health_font = bmpfont.BitmapFont("assets/healthfont.png", 6, 7, 48)
     
     def __init__(self,
@@ -25,66 +132,87 @@ class BaseUnit(Sprite):
                  tile_y = None,
                  angle = 0,
                  activate = False,
+                 game = None,
+                 state = None,
                  **keywords):
-
+        """
+        Makes a unit of the given team at the given tile position in the given
+        game (BaseUnit.game by default), activating it if asked to. A unit
+        can instead be made as a view of an existing gamestate.UnitState, in
+        which case it is active if its state is.
+        """
         Sprite.__init__(self)
         
-        #Take the keywords off
-        self.team = team
-        self.tile_x = tile_x
-        self.tile_y = tile_y
-        self._angle = angle
+        if state is None:
+            if game is None:
+                game = BaseUnit.game
+            pos = None
+            if tile_x is not None and tile_y is not None:
+                pos = (tile_x, tile_y)
+            state = game.new_unit(self.spec, team, pos)
+        
+        state.view = self
+        self._state = state
+        self._turn_state = TurnState(state)
         
         #Some default values so that nothing complains when trying to
         #assign later
         self._moving = False
-        self._active = False
-        self._path = []
-        self.turn_state = [False, False]
+        self._shown = None
         
-        #Default unit stats
-        self.health = 10
-        self.max_health = self.health
-        self.speed = 5
-        self.atk_range = 1
-        self.damage = 1
-        self.defense = 3
-        self.type = "Base Unit"
-        self.hit_effect = None
-        self.die_effect = effects.Explosion
-        self.move_sound = None
-        self.hit_sound = None
-        self.die_sound = "Explosion"
-        
-        #Dictionary of movement costs by tile type name
-        self._move_costs = {}
+        #Take the keywords off
+        self._tile_x, self._tile_y = state.pos or (tile_x, tile_y)
+        self._angle = angle
+        self._path = []
         
         #set required pygame things.
         self.image = None
         self.rect = pygame.Rect(0, 0, SIZE, SIZE)
         self._update_image()
         
-        if activate:
+        if activate or state.active:
             self.activate()
-            
-    @staticmethod
-    def get_unit_at_pos(pos):
+    
+    @property
+    def state(self):
         """
-        Returns the active unit at the given tile position, or None if no unit
-        is present.
+        The gamestate.UnitState this unit is a view of.
         """
-        for u in BaseUnit.active_units:
-            if (u.tile_x, u.tile_y) == pos:
-                return u
-        
-        return None
+        return self._state
     
     @property
     def active(self):
         """
         Returns whether this is active.
         """
-        return self._active
+        return self._state.active
+    
+    @property
+    def team(self):
+        """
+        The number of the team the unit is on.
+        """
+        return self._state.team
+    
+    @property
+    def health(self):
+        """
+        The unit's remaining health.
+        """
+        return self._state.health
+    
+    @property
+    def turn_state(self):
+        """
+        Whether the unit has moved and whether it has attacked this turn, as a
+        TurnState which can be indexed like a list of the two. Either can be
+        assigned a list of two.
+        """
+        return self._turn_state
+    
+    @turn_state.setter
+    def turn_state(self, state):
+        self._turn_state[0], self._turn_state[1] = state
     
     @property
     def angle(self):
@@ -107,7 +235,7 @@ class BaseUnit(Sprite):
             (i.e. North, South, East, West).
         """
         angle = abs(self._angle % 360)
-
+        
         if angle == 0:
             return "East"
         elif angle == 90:
@@ -116,18 +244,85 @@ class BaseUnit(Sprite):
             return "West"
         elif angle == 270:
             return "South"
-            
+    
+    @property
+    def tile_x(self):
+        """
+        The x position in tiles the unit is drawn at. This is fractional
+        while moving.
+        """
+        return self._tile_x
+    
+    @tile_x.setter
+    def tile_x(self, x):
+        self.set_tile_pos(x, self._tile_y)
+    
+    @property
+    def tile_y(self):
+        """
+        The y position in tiles the unit is drawn at. This is fractional
+        while moving.
+        """
+        return self._tile_y
+    
+    @tile_y.setter
+    def tile_y(self, y):
+        self.set_tile_pos(self._tile_x, y)
+    
     @property
     def tile_pos(self):
         """
-        Returns the unit's tile position.
+        Returns the tile position the unit is drawn at.
         """
-        return (self.tile_x, self.tile_y)
-                
+        return (self._tile_x, self._tile_y)
+    
+    def set_tile_pos(self, x, y):
+        """
+        Puts the unit at the given tile position, in its game as well as on
+        the screen. A fractional position is only drawn; the unit stays where
+        it was in the game.
+        
+        >>> game = gamestate.GameState([0] * 25, 5, 5, 2)
+        >>> u = BaseUnit(team = 0, tile_x = 1, tile_y = 1, activate = True,
+        ...              game = game)
+        >>> u.set_tile_pos(1.5, 1)
+        >>> game.unit_at((1, 1)) is u.state
+        True
+        >>> u.set_tile_pos(2, 1)
+        >>> game.unit_at((2, 1)) is u.state, u.state.pos
+        (True, (2, 1))
+        """
+        self._tile_x = x
+        self._tile_y = y
+        
+        if x is not None and y is not None and x % 1 == 0 and y % 1 == 0:
+            pos = (int(x), int(y))
+            if pos != self._state.pos:
+                self._state.game.place(self._state, pos)
+    
+    def sync(self):
+        """
+        Brings the unit up to date with its state: it is redrawn if its
+        health or fuel have changed, taken off the screen once it is no longer
+        active, and put where its state is if it isn't moving.
+        """
+        state = self._state
+        if not state.active:
+            BaseUnit.active_units.remove(self)
+            return
+        
+        if self._shown != (state.health, state.fuel):
+            self._update_image()
+        
+        if not self._moving and state.pos is not None:
+            self._tile_x, self._tile_y = state.pos
+
     def _update_image(self):
         """
         Re-renders the unit's image.
         """
+        self._shown = (self._state.health, self._state.fuel)
+        
         # Pick out the right sprite depending on the team
         subrect = pygame.Rect(self.team * SIZE,
                               0,
@@ -161,19 +356,17 @@ class BaseUnit(Sprite):
         
     def activate(self):
         """
-        Adds this unit to the active roster.
+        Puts this unit into play in its game, and on the screen.
         """
-        if not self._active:
-            self._active = True
-            BaseUnit.active_units.add(self)
+        self._state.game.activate(self._state)
+        BaseUnit.active_units.add(self)
     
     def deactivate(self):
         """
-        Removes this unit from the active roster.
+        Takes this unit out of play in its game, and off the screen.
         """
-        if self._active:
-            self._active = False
-            BaseUnit.active_units.remove(self)
+        self._state.game.deactivate(self._state)
+        BaseUnit.active_units.remove(self)
             
     def face_vector(self, vector):
         """
@@ -230,8 +423,11 @@ class BaseUnit(Sprite):
     def update(self):
         """
         Overrides the update function of the Sprite class.
-        Handles movement.
+        Handles movement, which plays out a move the unit has already made in
+        its game, and keeps the unit up to date with its state.
         """
+        self.sync()
+        
         if self._moving:
             #checks if path is empty
             if not self._path:
@@ -261,8 +457,8 @@ class BaseUnit(Sprite):
                 self.face_vector((dx, dy))
 
                 #set the new value
-                self.tile_x += dx
-                self.tile_y += dy
+                self._tile_x += dx
+                self._tile_y += dy
 
     def set_path(self, path):
         """
@@ -289,145 +485,6 @@ class BaseUnit(Sprite):
         self._angle = angle
         self._update_image()
         
-    def hurt(self, damage):
-        """
-        Causes damage to the unit, and destroys it when it's out of health.
-        """
-        self.health -= damage
-        
-        # Dead!
-        if self.health <= 0:
-            self.deactivate()
-        
-        # Update the health graphic.
-        self._update_image()
-        
-    def move_cost(self, tile):
-        """
-        Returns the cost of a unit moving over a certain tile.
-        Note: this should be greater than or equal to 1!
-        
-        Can be overridden for special behaviour. Make sure to use this as a
-        default return value just in case.
-        """
-        # If this is not defined, default to the lowest possible cost.
-        if tile.type not in self._move_costs:
-            return 1
-            
-        # Otherwise, return the cost.
-        return self._move_costs[tile.type]
-        
-    def is_passable(self, tile, pos):
-        """
-        Returns whether or not a unit can move over a certain tile.
-        Position is also passed so it can be checked for other units.
-        
-        Override this for subclasses, perhaps using this as the default value.
-        """
-        #If there's no tile there (i.e. mouse is off screen)
-        if not tile:
-            return False
-        
-        return True
-        
-    def is_stoppable(self, tile, pos):
-        """
-        Returns whether or not a unit can stop on a certain tile.
-        Position is also passed so it can be checked for other units.
-        
-        Override this for subclasses, perhaps using this as the default value.
-        """
-        # Can't park on a unit
-        for u in BaseUnit.active_units:
-            if (u.tile_x, u.tile_y) == pos:
-                return False
-        
-        return self.is_passable(tile, pos)
-        
-    def positions_in_range(self, from_tile, from_pos):
-        """
-        Returns a set of all tile coordinates in range of the given tile.
-        """
-        from_x, from_y = from_pos
-        tiles = set()
-        
-        # Get range
-        r = self.max_atk_range
-        # Add (or subtract) bonus range from occupied tile
-        r += from_tile.range_bonus
-        
-        # Add the tiles in range. Not the most efficient way, but
-        # probably the most readable.
-        for x in range(int(from_x - r), int(from_x + r + 1)):
-            for y in range(int(from_y - r), int(from_y + r + 1)):
-                
-                # Check if this is in range
-                if self.is_tile_in_range(from_tile, from_pos, (x, y)):
-                    tiles.add((x, y))
-                    
-        return tiles
-        
-    def is_attackable(self, from_tile, from_pos, to_tile, to_pos):
-        """
-        Returns whether the given tile is attackable.
-        
-        Override this for subclasses, perhaps using this as a default value.
-        """
-        # We can only attack within the unit's range.
-        if not self.is_tile_in_range(from_tile, from_pos, to_pos):
-            return False
-        
-        # Get the unit we're going to attack.
-        u = BaseUnit.get_unit_at_pos(to_pos)
-        
-        # We can't attack if there's no unit there, if it's on our team,
-        # if we can't hit this particular unit, or if the damage is 0
-        if (not u
-            or u.team == self.team
-            or not self.can_hit(u)
-            or self.get_damage(u, to_tile) == 0):
-            return False
-            
-        return True
-        
-    def get_damage(self, target, target_tile):
-        """
-        Returns the potential attack damage against a given enemy.
-        """
-        # If we can't hit then no damage
-        # This should only really happen when potential damage
-        # is requested
-        if not self.can_hit(target):
-            return 0
-
-        # Get the unit's current defense.
-        defense = target.get_defense(target_tile)
-        
-        # Don't do negative damage
-        if self.damage - defense < 0:
-            return 0
-        
-        return self.damage - defense
-        
-    def can_hit(self, target_unit):
-        """
-        Determines whether a unit can hit another unit.
-        
-        Really only used to be overridden in subclasses for special
-        effects.
-        """
-        return True
-        
-    def get_defense(self, tile = None):
-        """
-        Returns this unit's defense.
-        If a tile is specified the tile's defense bonus is added to
-        the return value.
-        """
-        if tile:
-            return self.defense + tile.defense_bonus
-        return self.defense
-        
     def get_atk_range(self, tile = None):
         """
         Returns the unit's maximum attack range, assuming that it is attacking
@@ -435,33 +492,3 @@ class BaseUnit(Sprite):
         unit's range.
         """
         return self.max_atk_range
-        
-    def can_turn_end(self):
-        """
-        Returns whether the player can end his turn. Sometimes, a unit may need
-        to block the turn from ending by returning false.
-        """
-        return True
-        
-    def turn_ended(self):
-        """
-        Called when the turn for this unit's team has ended.
-        Returns True if the unit is still alive, and False otherwise.
-        """
-        self.turn_state = [False, False]
-        return True
-        
-    def is_tile_in_range(self, from_tile, from_pos, to_pos):
-        """
-        Checks to see if a tile is in attackable range from its current
-        position. Takes tile range bonus into account.
-        """
-        # Get range
-        r = self.max_atk_range
-        # Add (or subtract) bonus range from occupied tile
-        r += from_tile.range_bonus
-        
-        dist = helper.manhattan_dist(from_pos, to_pos)
-        if dist <= r:
-            return True
-        return False
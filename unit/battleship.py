@@ -1,5 +1,5 @@
 from unit.water_unit import WaterUnit
-import unit, helper, effects
+import unit, helper, effects, rules
 from tiles import Tile
 import pygame
 
@@ -18,23 +18,15 @@ class Battleship(WaterUnit):
       uses are fairly specialized.
     """
     sprite = pygame.image.load("assets/battleship.png")
+    spec = rules.UNIT_SPECS["Battleship"]
     
-    def __init__(self, **keywords):
-        #load the image for the base class.
-        self._base_image = Battleship.sprite
-
-        #load the base class
-        super().__init__(**keywords)
-        
-        #sounds
-        self.hit_sound = "ArtilleryFire"
-
-        #set unit specific things.
-        self.type = "Battleship"
-        self.speed = 8
-        self.max_atk_range = 4
-        self.damage = 6
-        self.defense = 3
-        self.hit_effect = effects.Explosion
+    # The image for the base class
+    _base_image = sprite
+    
+    #sounds
+    hit_sound = "ArtilleryFire"
+    
+    #unit specific things
+    hit_effect = effects.Explosion
 
 unit.unit_types["Battleship"] = Battleship
@@ -1,5 +1,5 @@
 from unit.water_unit import WaterUnit
-import unit, helper, effects
+import unit, effects, rules
 from tiles import Tile
 import pygame
 
@@ -18,23 +18,15 @@ class Carrier(WaterUnit):
       unit.
     """
     sprite = pygame.image.load("assets/carrier.png")
+    spec = rules.UNIT_SPECS["Carrier"]
     
-    def __init__(self, **keywords):
-        #load the image for the base class.
-        self._base_image = Carrier.sprite
-
-        #load the base class
-        super().__init__(**keywords)
-        
-        #sounds
-        self.hit_sound = "MachineGunFire"
-
-        #set unit specific things.
-        self.type = "Carrier"
-        self.speed = 4
-        self.max_atk_range = 2
-        self.damage = 4
-        self.defense = 2
-        self.hit_effect = effects.Ricochet
+    # The image for the base class
+    _base_image = sprite
+    
+    #sounds
+    hit_sound = "MachineGunFire"
+    
+    #unit specific things
+    hit_effect = effects.Ricochet
 
 unit.unit_types["Carrier"] = Carrier
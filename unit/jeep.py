@@ -1,5 +1,5 @@
 from unit.ground_unit import GroundUnit
-import unit, helper, effects
+import unit, helper, effects, rules
 from tiles import Tile
 import pygame
 
@@ -19,30 +19,16 @@ class Jeep(GroundUnit):
       especially difficult to traverse.
     """
     sprite = pygame.image.load("assets/jeep.png")
+    spec = rules.UNIT_SPECS["Jeep"]
     
-    def __init__(self, **keywords):
-        #load the image for the base class.
-        self._base_image = Jeep.sprite
-
-        #load the base class
-        super().__init__(**keywords)
-        
-        #sounds
-        self.move_sound = "JeepMove"
-        self.hit_sound = "MachineGunFire"
-
-        #set unit specific things.
-        self.type = "Jeep"
-        self.speed = 10
-        self.max_atk_range = 2
-        self.damage = 5
-        self.defense = 1
-        self.hit_effect = effects.Ricochet
-        
-        self._move_costs = {'plains': 2,
-                             'sand': 3,
-                             'forest': 3,
-                             'road': 1,
-                             'mountain': 4}
+    # The image for the base class
+    _base_image = sprite
+    
+    #sounds
+    move_sound = "JeepMove"
+    hit_sound = "MachineGunFire"
+    
+    #unit specific things
+    hit_effect = effects.Ricochet
 
 unit.unit_types["Jeep"] = Jeep
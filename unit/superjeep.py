@@ -1,5 +1,5 @@
 from unit.jeep import Jeep
-import unit, helper, effects
+import unit, helper, effects, rules
 from tiles import Tile
 import pygame
 
@@ -19,12 +19,6 @@ class SuperJeep(Jeep):
     Other notes:
     - Used for testing pathfinding.
     """
-    def __init__(self, **keywords):
-        #load the base class
-        super().__init__(**keywords)
-
-        #set unit specific things.
-        self.type = "Incredibly Fast Jeep"
-        self.speed = 100
+    spec = rules.UNIT_SPECS["SuperJeep"]
 
 unit.unit_types["SuperJeep"] = SuperJeep
@@ -0,0 +1,163 @@
+from array import array
+import math
+import numpy as np
+
+# The per-unit columns of a UnitTable, and the array typecode of each. Rows
+# which aren't in use have a class_id of -1.
+COLUMNS = (('class_id', 'l'),
+           ('team', 'l'),
+           ('active', 'b'),
+           ('x', 'd'),
+           ('y', 'd'),
+           ('health', 'l'),
+           ('fuel', 'l'),
+           ('moved', 'b'),
+           ('attacked', 'b'))
+
+# The stats which a UnitTable keeps per unit class
+STATS = ('max_health',
+         'speed',
+         'damage',
+         'defense',
+         'min_atk_range',
+         'max_atk_range')
+
+class UnitTable:
+    """
+    The changing state of many units kept in parallel typed arrays, one row
+    per unit, with a table of stats per unit class. Each column in COLUMNS is
+    an attribute holding an array.array, so a single value can be read or
+    written as quickly as an attribute, while whole columns can be turned into
+    NumPy arrays to work on every unit at once. Positions are NaN where a unit
+    has none.
+
+    A unit class is anything holding the STATS as attributes, such as a
+    rules.UnitSpec. Class IDs are shared by every table, so tables of classes
+    (like damagetable's) can be indexed with any table's class_id column.
+
+    Rows are reused once released, so a table only grows to the largest
+    number of units alive at once. A gamestate.GameState keeps the state of
+    its units in its table.
+
+    >>> class Unit:
+    ...     speed, damage, defense = 3, 4, 1
+    ...     max_health, min_atk_range, max_atk_range = 10, 0, 1
+    >>> t = UnitTable()
+    >>> a, b = t.add(Unit), t.add(Unit)
+    >>> t.team[a], t.team[b] = 0, 1
+    >>> t.health[a], t.health[b] = 10, 4
+    >>> t.active[a] = t.active[b] = True
+    >>> rows = t.rows()
+    >>> (t.column('health')[rows] * t.column('team')[rows]).tolist()
+    [0, 4]
+    >>> t.class_stats('damage')[t.column('class_id')[rows]].tolist()
+    [4, 4]
+    >>> t.release(a)
+    >>> t.rows().tolist()
+    [1]
+    >>> t.add(Unit) == a
+    True
+    >>> UnitTable().register(Unit) == t.class_id[b]
+    True
+    """
+    # Unit classes by class ID, the IDs by the id() of each class (as specs
+    # can't be hashed), and the stats of each class by class ID once they
+    # have been looked up. These are shared by every table.
+    classes = []
+    _class_ids = {}
+    _stats = {}
+
+    def __init__(self):
+        for name, code in COLUMNS:
+            setattr(self, name, array(code))
+
+        # Released rows, which are handed out again first
+        self._free = []
+
+    def __len__(self):
+        return len(self.class_id)
+
+    def register(self, cls):
+        """
+        Returns the ID of the given unit class, giving it one if it doesn't
+        have one yet.
+        """
+        class_id = self._class_ids.get(id(cls))
+
+        # The class is kept in classes, so its id() is never reused
+        if class_id is None:
+            class_id = len(self.classes)
+            self.classes.append(cls)
+            self._class_ids[id(cls)] = class_id
+
+        return class_id
+
+    def add(self, cls):
+        """
+        Returns the index of a new row for a unit of the given class, with
+        every other column cleared.
+        """
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = len(self)
+            for name, _ in COLUMNS:
+                getattr(self, name).append(0)
+
+        self._clear(row)
+        self.class_id[row] = self.register(cls)
+        return row
+
+    def release(self, row):
+        """
+        Marks the given row as no longer in use, so it can be reused.
+        """
+        self._clear(row)
+        self._free.append(row)
+
+    def _clear(self, row):
+        """
+        Sets every column of the given row to its empty value.
+        """
+        for name, _ in COLUMNS:
+            getattr(self, name)[row] = 0
+        self.class_id[row] = -1
+        self.x[row] = self.y[row] = math.nan
+
+    def column(self, name):
+        """
+        Returns a NumPy copy of the given column, indexed by row.
+        """
+        column = getattr(self, name)
+        return np.frombuffer(column, dtype = column.typecode).copy()
+
+    def rows(self, team = None):
+        """
+        Returns a NumPy array of the rows of the active units, or only those
+        on the given team.
+        """
+        active = self.column('active').astype(bool)
+        if team is not None:
+            active &= self.column('team') == team
+
+        return np.nonzero(active)[0]
+
+    def class_stats(self, name):
+        """
+        Returns a NumPy array holding the given stat (one of STATS) of every
+        unit class, indexed by class ID.
+
+        The stats of a class are read from its attributes the first time they
+        are needed.
+        """
+        for class_id, cls in enumerate(self.classes):
+            if class_id not in self._stats:
+                self._stats[class_id] = tuple(getattr(cls, s) for s in STATS)
+
+        i = STATS.index(name)
+        return np.array([self._stats[class_id][i]
+                         for class_id in range(len(self.classes))])
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()